@@ -0,0 +1,233 @@
+"""
+Benchmarks of the simulation and optimisation hot paths.
+
+Run from the repository root:
+
+    python -m benchmarks.run_benchmarks                       # print results
+    python -m benchmarks.run_benchmarks --save baseline.json  # store results as a baseline
+    python -m benchmarks.run_benchmarks --compare baseline.json --tolerance 0.2
+
+All inputs are fixed (config1 of tests/configs.py and decision vectors drawn with a fixed seed),
+so results are comparable between runs on the same machine. With --compare the exit code is 1 if any
+benchmark got slower than the baseline by more than the tolerance.
+"""
+import argparse
+import copy
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+from configuration.keys import *
+from moo.optigob_problem import Optigob_Problem, build_json_config, heal_variables, DEFAULT_LOWER_BOUND, DEFAULT_UPPER_BOUND
+from optigob.optigob import Optigob
+from resource_manager.create_database import read_forestry
+from tests.configs import config1
+
+DB_FILE = "data/database.db"
+STATIC_FILE = "data/static_systems.xlsx"
+HORIZONS = [2050, 2070, 2100, 2120]
+PARAMETERS = [CO2E, AREA, PROTEIN, BIO_ENERGY, HWP, SUBSTITUTION, BIODIVERSITY]
+
+
+def random_vectors(n, seed):
+    rng = random.Random(seed)
+    vectors = []
+    for _ in range(n):
+        variables = [rng.randint(lb, ub) for (lb, ub) in zip(DEFAULT_LOWER_BOUND, DEFAULT_UPPER_BOUND)]
+        vectors.append(heal_variables(variables, DEFAULT_UPPER_BOUND))
+    return vectors
+
+
+def with_horizon(config, target_year):
+    config = copy.deepcopy(config)
+    config[TARGET_YEAR] = target_year
+    return config
+
+
+class Stages:
+    # accumulates the time spent in named stages of one benchmark run
+
+    def __init__(self):
+        self.times = {}
+        self.start = None
+
+    def __call__(self, name):
+        self.name = name
+        return self
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *args):
+        self.times[self.name] = self.times.get(self.name, 0.0) + time.perf_counter() - self.start
+
+
+def bench_optigob(configs):
+    def run(stages):
+        for config in configs:
+            with stages("load"):
+                optigob = Optigob(json_config=config, db_file_path=DB_FILE)
+            with stages("run"):
+                optigob.run()
+            with stages("get_evaluation"):
+                for parameter in PARAMETERS:
+                    optigob.get_evaluation(parameter)
+        return len(configs)
+    return run
+
+
+def bench_problem(vectors, compiled):
+    def run(stages):
+        problem = Optigob_Problem(db_file_path=DB_FILE, compiled=compiled)
+        with stages("evaluate"):
+            for variables in vectors:
+                solution = problem.create_solution()
+                solution.variables = list(variables)
+                problem.evaluate(solution)
+        return len(vectors)
+    return run
+
+
+def bench_heal(vectors):
+    def run(stages):
+        with stages("heal_variables"):
+            for variables in vectors:
+                heal_variables(list(variables), DEFAULT_UPPER_BOUND)
+        return len(vectors)
+    return run
+
+
+def bench_export(config, format="xlsx", layout="fields"):
+    optigob = Optigob(json_config=config, db_file_path=DB_FILE)
+    optigob.run()
+
+    def run(stages):
+        with stages("export_time_series"):
+            optigob.export_time_series(format=format, layout=layout)
+        return 1
+    return run
+
+
+def bench_read_forestry():
+    def run(stages):
+        directory = tempfile.mkdtemp()
+        try:
+            with stages("read_forestry"):
+                read_forestry(STATIC_FILE, os.path.join(directory, "database.db"))
+        finally:
+            shutil.rmtree(directory)
+        return 1
+    return run
+
+
+def get_benchmarks(quick):
+    n_vectors = 20 if quick else 100
+    vectors = random_vectors(n_vectors, seed=42)
+
+    benchmarks = {}
+    # config1 has its last waypoint in 2050, the sampled configs run to 2120 with waypoints up to 2120
+    for horizon in HORIZONS:
+        benchmarks[f"optigob_config1_{horizon}"] = bench_optigob([with_horizon(config1, horizon)])
+    benchmarks["optigob_random_2120"] = bench_optigob([build_json_config(v) for v in vectors[:10]])
+    benchmarks["problem_evaluate_compiled"] = bench_problem(vectors, compiled=True)
+    benchmarks["problem_evaluate_json"] = bench_problem(vectors, compiled=False)
+    benchmarks["heal_variables"] = bench_heal(random_vectors(n_vectors * 10, seed=43))
+    benchmarks["export_time_series"] = bench_export(config1)
+    benchmarks["export_csv_long"] = bench_export(config1, format="csv", layout="long")
+    benchmarks["export_npz"] = bench_export(config1, format="npz")
+    benchmarks["read_forestry"] = bench_read_forestry()
+    return benchmarks
+
+
+def measure(benchmark, repeat):
+    # timings without tracemalloc, which slows down allocations, then one extra run for the peak memory
+    benchmark(Stages())
+
+    times, stage_times = [], []
+    for _ in range(repeat):
+        stages = Stages()
+        start = time.perf_counter()
+        n = benchmark(stages)
+        times.append(time.perf_counter() - start)
+        stage_times.append(stages.times)
+
+    tracemalloc.start()
+    benchmark(Stages())
+    (_, peak) = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    seconds = statistics.median(times)
+    return {
+        "seconds": seconds,
+        "operations": n,
+        "operations_per_second": n / seconds if seconds > 0 else float("inf"),
+        "peak_memory_mb": peak / 1024 / 1024,
+        "stages": {name: statistics.median(t[name] for t in stage_times) for name in stage_times[0]},
+    }
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    print(f"\n{'benchmark':<32}{'baseline s':>12}{'current s':>12}{'ratio':>8}")
+    for name, result in results.items():
+        if name not in baseline["benchmarks"]:
+            continue
+        base = baseline["benchmarks"][name]["seconds"]
+        ratio = result["seconds"] / base if base > 0 else float("inf")
+        flag = ""
+        if ratio > 1.0 + tolerance:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<32}{base:>12.4f}{result['seconds']:>12.4f}{ratio:>8.2f}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OptiGOB performance benchmarks")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per benchmark, the median is reported")
+    parser.add_argument("--quick", action="store_true", help="fewer decision vectors")
+    parser.add_argument("--filter", default="", help="only run benchmarks whose name contains this")
+    parser.add_argument("--save", help="write the results as a baseline json file")
+    parser.add_argument("--compare", help="baseline json file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown against the baseline")
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{'benchmark':<32}{'ops/s':>12}{'peak MB':>10}  stages (s)")
+    for name, benchmark in get_benchmarks(args.quick).items():
+        if args.filter not in name:
+            continue
+        result = measure(benchmark, args.repeat)
+        results[name] = result
+        stages = ", ".join(f"{stage} {seconds:.4f}" for stage, seconds in result["stages"].items())
+        print(f"{name:<32}{result['operations_per_second']:>12.2f}{result['peak_memory_mb']:>10.2f}  {stages}")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"created": datetime.now().isoformat(timespec="seconds"),
+                       "python": sys.version.split()[0],
+                       "platform": platform.platform(),
+                       "repeat": args.repeat,
+                       "quick": args.quick,
+                       "benchmarks": results}, f, indent=2)
+        print(f"\nResults saved to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) slower than the baseline by more than {args.tolerance:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
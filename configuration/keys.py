@@ -1,6 +1,7 @@
 NAME = "name"
 BASELINE_YEAR = "baseline_year"
 TARGET_YEAR = "target_year"
+CO2E_METRIC = "co2e_metric"
 WAY_POINTS = "waypoints"
 
 CO2E = "co2e"
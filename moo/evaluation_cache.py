@@ -0,0 +1,88 @@
+import os
+import sqlite3
+from collections import OrderedDict
+
+from resource_manager.snapshot import get_database_digest
+
+# bump when the simulation or the objectives change, persisted objectives of an older model are not reused
+CACHE_VERSION = 1
+
+
+class EvaluationCache:
+    """
+    Bounded LRU cache of objective values keyed on healed decision vectors.
+
+    If file_path is given, the cache is loaded from and saved to a SQLite file so that entries survive
+    across runs. Entries are only reused for the same database content and CACHE_VERSION.
+    """
+
+    def __init__(self, max_size=100000, file_path=None, db_file_path="data/database.db"):
+        self.max_size = max_size
+        self.file_path = file_path
+        self.db_file_path = db_file_path
+        self.cache_key = None
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+        if self.file_path is not None and os.path.exists(self.file_path):
+            self.load()
+
+    def get(self, variables):
+        key = tuple(variables)
+        objectives = self.entries.get(key)
+        if objectives is None:
+            self.misses += 1
+            return None
+
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return list(objectives)
+
+    def put(self, variables, objectives):
+        key = tuple(variables)
+        self.entries[key] = tuple(objectives)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def get_hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total > 0 else 0.0
+
+    def get_cache_key(self):
+        # the database is only hashed for a persistent cache, the first time the file is read or written
+        if self.cache_key is None:
+            self.cache_key = f"{CACHE_VERSION}:{get_database_digest(self.db_file_path)}"
+        return self.cache_key
+
+    def load(self):
+        conn = sqlite3.connect(self.file_path)
+        try:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'cache_key'").fetchone()
+            if row is None or row[0] != self.get_cache_key():
+                return
+            for (variables, co2e, hnv, protein, hwp) in conn.execute("SELECT variables, co2e, hnv, protein, hwp FROM evaluations ORDER BY rowid"):
+                self.put([int(v) for v in variables.split(",")], (co2e, hnv, protein, hwp))
+        except sqlite3.OperationalError:
+            # not a cache file written by save()
+            pass
+        finally:
+            conn.close()
+
+    def save(self):
+        if self.file_path is None:
+            return
+
+        conn = sqlite3.connect(self.file_path)
+        try:
+            with conn:
+                conn.execute("DROP TABLE IF EXISTS meta")
+                conn.execute("DROP TABLE IF EXISTS evaluations")
+                conn.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+                conn.execute("CREATE TABLE evaluations (variables TEXT PRIMARY KEY, co2e REAL, hnv REAL, protein REAL, hwp REAL)")
+                conn.execute("INSERT INTO meta VALUES ('cache_key', ?)", (self.get_cache_key(),))
+                conn.executemany("INSERT INTO evaluations VALUES (?, ?, ?, ?, ?)",
+                                 ((",".join(str(v) for v in key),) + tuple(objectives) for key, objectives in self.entries.items()))
+        finally:
+            conn.close()
@@ -0,0 +1,106 @@
+import numpy as np
+
+
+def get_nondominated(points):
+    # removes duplicate and dominated points (minimisation)
+    points = np.unique(points, axis=0)
+    if len(points) <= 1:
+        return points
+
+    dominates = np.all(points[:, None, :] <= points[None, :, :], axis=2)
+    np.fill_diagonal(dominates, False)
+    return points[~dominates.any(axis=0)]
+
+
+def hypervolume_2d(points, reference):
+    order = np.lexsort((points[:, 1], points[:, 0]))
+    x = points[order, 0]
+    y = points[order, 1]
+    previous_y = np.concatenate(([reference[1]], np.minimum.accumulate(y)[:-1]))
+    return float(np.sum((reference[0] - x) * np.clip(previous_y - y, 0.0, None)))
+
+
+def hypervolume_3d(points, reference):
+    # sweep along the last objective, each slab is the 2d front of the points below it
+    points = points[np.argsort(points[:, 2], kind="stable")]
+    heights = np.diff(np.append(points[:, 2], reference[2]))
+    volume = 0.0
+    for k in range(len(points)):
+        if heights[k] > 0:
+            volume += heights[k] * hypervolume_2d(points[:k + 1, :2], reference[:2])
+    return volume
+
+
+def hypervolume_nd(points, reference):
+    # points are non-dominated and strictly dominate the reference point
+    n, d = points.shape
+    if n == 0:
+        return 0.0
+    if n == 1:
+        return float(np.prod(reference - points[0]))
+    if d == 2:
+        return hypervolume_2d(points, reference)
+    if d == 3:
+        return hypervolume_3d(points, reference)
+
+    # slice along the first objective from the worst point to the best, the exclusive volume of each
+    # point is then bounded by the points after it, whose first objective is all better (WFG)
+    points = points[np.argsort(-points[:, 0], kind="stable")]
+    volume = 0.0
+    for k in range(n):
+        p = points[k]
+        inclusive = np.prod(reference[1:] - p[1:])
+        if k + 1 < n:
+            limited = np.maximum(points[k + 1:, 1:], p[1:])
+            if np.any(np.all(limited == p[1:], axis=1)):
+                # p is covered by a better point in the remaining objectives
+                continue
+            inclusive -= hypervolume_nd(get_nondominated(limited), reference[1:])
+        volume += (reference[0] - p[0]) * inclusive
+    return float(volume)
+
+
+def hypervolume(points, reference):
+    """
+    Exact hypervolume dominated by points up to the reference point, all objectives minimised.
+    Points not strictly dominating the reference point do not contribute.
+    """
+    points = np.asarray(points, dtype=float).reshape(-1, len(reference))
+    reference = np.asarray(reference, dtype=float)
+
+    points = points[np.all(points < reference, axis=1)]
+    if len(points) == 0:
+        return 0.0
+    return hypervolume_nd(get_nondominated(points), reference)
+
+
+class HypervolumeHistory:
+    """
+    Hypervolume of the front of each generation of a run, computed once per generation.
+
+    Objectives are normalised with the ideal and nadir point of the first generation and the reference
+    point lies margin beyond its nadir, so values of earlier generations stay valid as the run grows.
+    """
+
+    def __init__(self, margin=0.1):
+        self.margin = margin
+        self.minimum = None
+        self.scale = None
+        self.values = {}
+
+    def update(self, generations):
+        # generations: {generation: array of objective vectors}, only new generations are computed
+        for generation in sorted(generations):
+            if generation in self.values:
+                continue
+
+            points = np.asarray(generations[generation], dtype=float)
+            if self.minimum is None:
+                self.minimum = points.min(axis=0)
+                self.scale = points.max(axis=0) - self.minimum
+                self.scale[self.scale == 0] = 1.0
+
+            normalised = (points - self.minimum) / self.scale
+            self.values[generation] = hypervolume(normalised, np.full(points.shape[1], 1.0 + self.margin))
+
+        return self.values
@@ -1,14 +1,19 @@
 from jmetal.algorithm.multiobjective import NSGAII
 from jmetal.operator.crossover import IntegerSBXCrossover
 from jmetal.operator.mutation import IntegerPolynomialMutation
+from jmetal.util.evaluator import SequentialEvaluator
 from jmetal.util.termination_criterion import StoppingByEvaluations
 
+from moo.evaluation_cache import EvaluationCache
 from moo.observer import MOO_Observer
+from moo.parallel_evaluator import ProcessPoolEvaluator
+from moo.results_store import ResultsStore, RESULTS_FILE
+from optigob import profiling
 from moo.optigob_problem import Optigob_Problem, build_json_config
 
 from moo.optigob_problem import DEFAULT_LOWER_BOUND, DEFAULT_UPPER_BOUND
 
-import os, shutil
+import contextlib, os, random, shutil
 
 def run_nsga2(params=None, on_generation=None):
     """
@@ -17,7 +22,11 @@ def run_nsga2(params=None, on_generation=None):
     params: dict with keys population_size, mutation_probability,
             mutation_distribution_index, crossover_probability,
             crossover_distribution_index, max_evaluations,
-            and optionally lower_bound / upper_bound (lists of 83 ints).
+            and optionally lower_bound / upper_bound (lists of 83 ints),
+            seed, evaluator_workers (number of worker processes, 1 = sequential),
+            evaluator_chunk_size, evaluation_cache_size (0 disables memoisation)
+            evaluation_cache_file (persists memoised objectives across runs)
+            and profile (per-stage timings, also enabled by OPTIGOB_PROFILE=1).
             If None, uses the original hardcoded defaults.
     on_generation: optional callable(generation_number) called after each generation.
     """
@@ -35,7 +44,13 @@ def run_nsga2(params=None, on_generation=None):
     else:
         print("[nsga2] No custom bounds — using problem defaults")
 
-    problem = Optigob_Problem(lower_bound=lower_bound, upper_bound=upper_bound)
+    evaluation_cache_size = params.get("evaluation_cache_size", 100000) if params else 100000
+    evaluation_cache = None
+    if evaluation_cache_size > 0:
+        evaluation_cache = EvaluationCache(max_size=evaluation_cache_size,
+                                           file_path=params.get("evaluation_cache_file") if params else None)
+
+    problem = Optigob_Problem(lower_bound=lower_bound, upper_bound=upper_bound, evaluation_cache=evaluation_cache)
     print(f"[nsga2] Problem created: lower_bound[7]={problem.lower_bound[7]}, upper_bound[7]={problem.upper_bound[7]} (Pigs WP1 year, raw)")
 
     if params is None:
@@ -53,6 +68,22 @@ def run_nsga2(params=None, on_generation=None):
         crossover_distribution_index = params["crossover_distribution_index"]
         max_evaluations = params["max_evaluations"]
 
+    # profiles this run only, a process-wide profiler is left as it is
+    profile = params.get("profile", False) if params else False
+
+    seed = params.get("seed") if params else None
+    if seed is not None:
+        random.seed(seed)
+
+    workers = params.get("evaluator_workers", 1) if params else 1
+    if workers > 1:
+        evaluator = ProcessPoolEvaluator(problem,
+                                         processes=workers,
+                                         chunk_size=params.get("evaluator_chunk_size"))
+        print(f"[nsga2] Evaluating on {workers} worker processes")
+    else:
+        evaluator = SequentialEvaluator()
+
     algorithm = NSGAII(
         problem=problem,
         population_size=population_size,
@@ -68,18 +99,35 @@ def run_nsga2(params=None, on_generation=None):
         termination_criterion=StoppingByEvaluations(
             max_evaluations=max_evaluations,
         ),
+        population_evaluator=evaluator,
     )
 
-    algorithm.observable.register(
-        MOO_Observer(population_size, on_generation=on_generation, upper_bound=problem.upper_bound)
-    )
-
-    results_dir = "moo/results/"
+    results_dir = os.path.dirname(RESULTS_FILE)
     if os.path.exists(results_dir):
         shutil.rmtree(results_dir)
     os.makedirs(results_dir)
+    results_store = ResultsStore(RESULTS_FILE)
+
+    algorithm.observable.register(
+        MOO_Observer(population_size, on_generation=on_generation, upper_bound=problem.upper_bound,
+                     evaluation_cache=evaluation_cache, results_store=results_store)
+    )
+
+    with profiling.profile() if profile else contextlib.nullcontext():
+        try:
+            algorithm.run()
+        finally:
+            results_store.close()
+            if isinstance(evaluator, ProcessPoolEvaluator):
+                evaluator.shutdown()
+            if evaluation_cache is not None:
+                evaluation_cache.save()
 
-    algorithm.run()
+            # worker processes profile separately, with several workers only this process's stages are included
+            profiler = profiling.get_profiler()
+            if profiler is not None:
+                profiler.print_summary()
+                profiler.save_chrome_trace(os.path.join(results_dir, "profile_trace.json"))
 
     result = algorithm.result()
 
@@ -1,15 +1,18 @@
 from jmetal.core.observer import Observer
 from jmetal.util.ranking import FastNonDominatedRanking
-from moo.optigob_problem import build_json_config, heal_variables
-import csv
+from moo.optigob_problem import heal_variables
 
 class MOO_Observer(Observer):
 
-    def __init__(self, population_size, on_generation=None, upper_bound=None):
+    def __init__(self, population_size, on_generation=None, upper_bound=None, evaluation_cache=None, results_store=None):
         super().__init__()
         self.population_size = population_size
+        self.results_store = results_store
         self.on_generation = on_generation
         self.upper_bound = upper_bound
+        self.evaluation_cache = evaluation_cache
+        self.cache_hits = 0
+        self.cache_misses = 0
 
     def update(self, *args, **kwargs):
 
@@ -24,17 +27,21 @@ class MOO_Observer(Observer):
 
         print("Generation " + str(generation)  + " complete")
 
-        pareto_file = "moo/results/gen" + str(generation) + "_pareto.csv"
-
-        with open(pareto_file, "w") as file:
-            writer = csv.writer(file)
-
-            writer.writerow(["co2e", "hnv", "protein", "hwp", "json"])
+        if self.evaluation_cache is not None:
+            hits = self.evaluation_cache.hits - self.cache_hits
+            misses = self.evaluation_cache.misses - self.cache_misses
+            self.cache_hits = self.evaluation_cache.hits
+            self.cache_misses = self.evaluation_cache.misses
+            print(f"Evaluation cache: {hits} hits, {misses} misses this generation, "
+                  f"{self.evaluation_cache.get_hit_rate():.1%} hit rate overall, {len(self.evaluation_cache.entries)} entries")
 
+        if self.results_store is not None:
+            solutions = []
             for solution in pareto_front:
                 vars_list = list(solution.variables)
                 heal_variables(vars_list, self.upper_bound)
-                writer.writerow([solution.objectives[0], solution.objectives[1], solution.objectives[2], solution.objectives[3], build_json_config(vars_list)])
+                solutions.append((vars_list, solution.objectives[:4]))
+            self.results_store.append(generation, solutions)
 
         if self.on_generation is not None:
             self.on_generation(generation)
\ No newline at end of file
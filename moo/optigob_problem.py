@@ -12,6 +12,25 @@ _WAYPOINT_GROUPS = [
     (43, 48, 53), (58, 60, 62), (64, 66, 68), (70, 72, 74), (77, 80, 82),
 ]
 
+ABATEMENT_TYPES = ["2020 BL", "MACC", "Frontier"]
+BOOL_TYPES = [True, False]
+HARVEST_TYPES = ["low", "high"]
+CATTLE_PROD_TYPES = ["2020 Prod", "Medium increase", "Strong increase"]
+
+# first variable index of each waypoint, same layout as build_json_config
+_NON_CATTLE_WAYPOINTS = {
+    NON_CATTLE_AGRICULTURE_PIGS: (7, 10, 13),
+    NON_CATTLE_AGRICULTURE_POULTRY: (16, 19, 22),
+    NON_CATTLE_AGRICULTURE_SHEEP: (25, 28, 31),
+    NON_CATTLE_AGRICULTURE_CROPS: (34, 37, 40),
+}
+_CATTLE_WAYPOINTS = (43, 48, 53)
+_ORGANIC_SOILS_WAYPOINTS = {
+    ORGANIC_SOILS_ORGANIC_SOIL_UNDER_GRASS: (58, 60, 62),
+    ORGANIC_SOILS_INDUSTRIAL_PEAT: (64, 66, 68),
+    ORGANIC_SOILS_DOMESTIC_PEAT: (70, 72, 74),
+}
+
 DEFAULT_LOWER_BOUND = [0,0,0,0,0,0,0,min_year,0,0,min_year,0,0,min_year,0,0,min_year,0,0,min_year,0,0,min_year,0,0,min_year,0,0,min_year,0,0,min_year,0,0,min_year,0,0,min_year,0,0,min_year,0,0,min_year,0,0,0,0,min_year,0,0,0,0,min_year,0,0,0,0,min_year,0,min_year,0,min_year,0,min_year,0,min_year,0,min_year,0,min_year,0,min_year,0,min_year,0,0,min_year,0,0,min_year,0,min_year]
 DEFAULT_UPPER_BOUND = [1,1,1,1,20,1,1,max_year,2,200,max_year,2,200,max_year,2,200,max_year,2,200,max_year,2,200,max_year,2,200,max_year,2,200,max_year,2,200,max_year,2,200,max_year,2,200,max_year,2,200,max_year,2,200,max_year,2,200,2,2,max_year,2,200,2,2,max_year,2,200,2,2,max_year,100,max_year,100,max_year,100,max_year,100,max_year,100,max_year,100,max_year,100,max_year,100,max_year,100,1,max_year,1,20000,max_year,20000,max_year]
 
@@ -34,11 +53,85 @@ def heal_variables(variables, upper_bound=None):
     return variables
 
 
+class CompiledOptigob:
+    """
+    Evaluates decision vectors on a single, reused Optigob model.
+
+    The model is built once from build_json_config. For every vector the system and waypoint
+    parameters are overwritten in place and the time series are reloaded and rerun, which skips
+    building the nested config and constructing the fields and systems.
+    """
+
+    def __init__(self, db_file_path="data/database.db", array_backed=False):
+        template = heal_variables(list(DEFAULT_LOWER_BOUND))
+        template[76] = 0  # include anaerobic digestion, it is dropped per vector if not implemented
+
+        self.optigob = Optigob(json_config=build_json_config(template),
+                               db_file_path=db_file_path,
+                               array_backed=array_backed)
+        self.all_fields = list(self.optigob.fields)
+        self.ad_field = self.optigob.get_field(AD_EMISSIONS)
+
+    def apply_variables(self, solution):
+        forestry = self.optigob.get_field(FORESTRY)
+        existing_forest = forestry.get_system(FORESTRY_EXISTING_FOREST)
+        existing_forest.harvest = HARVEST_TYPES[solution[0]]
+        existing_forest.ccs = BOOL_TYPES[solution[1]]
+        afforestation = forestry.get_system(FORESTRY_AFFORESTATION)
+        afforestation.harvest = HARVEST_TYPES[solution[2]]
+        afforestation.ccs = BOOL_TYPES[solution[3]]
+        afforestation.afforestation_rate = float(solution[4]) / 2.0
+        afforestation.broadleaf_frac = 0.5 if solution[5] == 0 else 0.3
+        afforestation.organic_soil = 0.15 if solution[6] == 0 else 0
+
+        non_cattle = self.optigob.get_field(NON_CATTLE_AGRICULTURE)
+        for name, indices in _NON_CATTLE_WAYPOINTS.items():
+            for waypoint, i in zip(non_cattle.get_system(name).waypoints, indices):
+                waypoint.year = solution[i] * 10
+                waypoint.abatement = ABATEMENT_TYPES[solution[i + 1]]
+                waypoint.scaler = float(solution[i + 2]) / 100.0
+
+        # dairy and beef share the same waypoint objects
+        cattle = self.optigob.get_field(CATTLE_AGRICULTURE)
+        for waypoint, i in zip(cattle.get_system(CATTLE_AGRICULTURE_DAIRY).waypoints, _CATTLE_WAYPOINTS):
+            waypoint.year = solution[i] * 10
+            waypoint.abatement = ABATEMENT_TYPES[solution[i + 1]]
+            waypoint.scaler = float(solution[i + 2]) / 100.0
+            waypoint.dairy_productivity = CATTLE_PROD_TYPES[solution[i + 3]]
+            waypoint.beef_productivity = CATTLE_PROD_TYPES[solution[i + 4]]
+
+        organic_soils = self.optigob.get_field(ORGANIC_SOILS)
+        for name, indices in _ORGANIC_SOILS_WAYPOINTS.items():
+            for waypoint, i in zip(organic_soils.get_system(name).waypoints, indices):
+                waypoint.year = solution[i] * 10
+                waypoint.rewetting_ratio = float(solution[i + 1]) / 100.0
+
+        ad = self.ad_field.get_system(AD_EMISSIONS)
+        ad.implementation_year = solution[77] * 10
+        ad.ccs = BOOL_TYPES[solution[78]]
+        ad.additional_grass_biomethane = solution[79]
+        ad.additional_biomethane_year = solution[80] * 10
+        ad.cdr_bioenergy = solution[81]
+        ad.willow_year = solution[82] * 10
+
+        self.optigob.fields = [fi for fi in self.all_fields if fi is not self.ad_field or BOOL_TYPES[solution[76]]]
+
+    def evaluate(self, solution):
+        self.apply_variables(solution)
+        self.optigob.reload()
+        self.optigob.run()
+        return self.optigob
+
+
 class Optigob_Problem(IntegerProblem):
-    def __init__(self, lower_bound=None, upper_bound=None):
+    def __init__(self, lower_bound=None, upper_bound=None, db_file_path="data/database.db", evaluation_cache=None, compiled=True):
         super().__init__()
         self.lower_bound = list(lower_bound) if lower_bound is not None else list(DEFAULT_LOWER_BOUND)
         self.upper_bound = list(upper_bound) if upper_bound is not None else list(DEFAULT_UPPER_BOUND)
+        self.db_file_path = db_file_path
+        self.evaluation_cache = evaluation_cache
+        self.compiled = compiled
+        self.compiled_optigob = None
 
     def number_of_objectives(self) -> int:
         return 4
@@ -48,16 +141,30 @@ class Optigob_Problem(IntegerProblem):
 
     def evaluate(self, solution: IntegerSolution) -> IntegerSolution:
         solution = self.heal(solution)
-        json_config = build_json_config(solution.variables)
+        if self.evaluation_cache is not None:
+            objectives = self.evaluation_cache.get(solution.variables)
+            if objectives is not None:
+                solution.objectives = objectives
+                return solution
 
-        optigob = Optigob(json_config=json_config, db_file_path="data/database.db")
-        optigob.run()
+        if self.compiled:
+            if self.compiled_optigob is None:
+                self.compiled_optigob = CompiledOptigob(self.db_file_path)
+            optigob = self.compiled_optigob.evaluate(solution.variables)
+        else:
+            json_config = build_json_config(solution.variables)
+
+            optigob = Optigob(json_config=json_config, db_file_path=self.db_file_path)
+            optigob.run()
 
         solution.objectives[0] = get_objective(optigob=optigob, parameter=CO2E, filter="net_zero_co2e")
         solution.objectives[1] = -get_objective(optigob=optigob, parameter=BIODIVERSITY)
         solution.objectives[2] = -get_objective(optigob=optigob, parameter=PROTEIN)
         solution.objectives[3] = -get_objective(optigob=optigob, parameter=HWP)
 
+        if self.evaluation_cache is not None:
+            self.evaluation_cache.put(solution.variables, solution.objectives)
+
         return solution
 
 
@@ -73,10 +180,10 @@ class Optigob_Problem(IntegerProblem):
 
 def build_json_config(solution):
 
-    abatement_types = ["2020 BL", "MACC", "Frontier"]
-    bool_types = [True, False]
-    harvest_types = ["low", "high"]
-    cattle_prod_types = ["2020 Prod", "Medium increase", "Strong increase"]
+    abatement_types = ABATEMENT_TYPES
+    bool_types = BOOL_TYPES
+    harvest_types = HARVEST_TYPES
+    cattle_prod_types = CATTLE_PROD_TYPES
 
     ef_harvest = harvest_types[solution[0]]
     ef_ccs = bool_types[solution[1]]
@@ -425,11 +532,4 @@ def build_json_config(solution):
     return json_config
 
 def get_objective(optigob, parameter, filter="total_"):
-    parameter_list = optigob.get_evaluation(parameter)
-    sum = 0
-    for n, l in parameter_list:
-        if filter in n:
-            for i in l:
-                sum = sum + i
-
-    return sum
\ No newline at end of file
+    return optigob.get_cumulative_total(parameter, filter=filter)
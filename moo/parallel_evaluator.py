@@ -0,0 +1,90 @@
+import copy
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from jmetal.core.solution import IntegerSolution
+from jmetal.util.evaluator import Evaluator
+
+from resource_manager.data_cache import get_data_cache
+from resource_manager.database_manager import TABLES
+
+# problem instance of the current worker process, set by init_worker
+_worker_problem = None
+
+
+def init_worker(problem):
+    global _worker_problem
+    _worker_problem = problem
+
+    # warm the process-wide data cache once, instead of on the first evaluation of every worker
+    cache = get_data_cache(problem.db_file_path)
+    for table in TABLES:
+        cache.get_table(table)
+
+
+def evaluate_variables(variables):
+    problem = _worker_problem
+    solution = IntegerSolution(problem.lower_bound, problem.upper_bound, problem.number_of_objectives())
+    solution.variables = list(variables)
+    problem.evaluate(solution)
+    return solution.variables, solution.objectives
+
+
+class ProcessPoolEvaluator(Evaluator):
+    """
+    Evaluates a population on a pool of worker processes.
+
+    Only the decision variables are sent to the workers and the healed variables and objectives are
+    written back in population order, so results only depend on the algorithm's random seed and not
+    on the number of workers. Solutions found in the problem's evaluation cache, and duplicates
+    within the population, are not dispatched at all.
+    """
+
+    def __init__(self, problem, processes=None, chunk_size=None):
+        self.processes = processes if processes is not None else os.cpu_count()
+        self.chunk_size = chunk_size
+
+        # the evaluation cache stays in this process, each worker compiles its own model
+        worker_problem = copy.copy(problem)
+        worker_problem.evaluation_cache = None
+        worker_problem.compiled_optigob = None
+        self.pool = ProcessPoolExecutor(max_workers=self.processes,
+                                        initializer=init_worker,
+                                        initargs=(worker_problem,))
+
+    def evaluate(self, solution_list, problem):
+        chunk_size = self.chunk_size
+        cache = problem.evaluation_cache
+        pending = {}
+        for solution in solution_list:
+            problem.heal(solution)
+            key = tuple(solution.variables)
+            if key in pending:
+                pending[key].append(solution)
+                if cache is not None:
+                    cache.hits += 1
+                continue
+
+            objectives = cache.get(key) if cache is not None else None
+            if objectives is not None:
+                solution.objectives = objectives
+            else:
+                pending[key] = [solution]
+
+        variables = list(pending.keys())
+        if chunk_size is None:
+            # a few chunks per worker balances load without paying per-solution dispatch overhead
+            chunk_size = max(1, math.ceil(len(variables) / (4 * self.processes)))
+        results = self.pool.map(evaluate_variables, variables, chunksize=chunk_size)
+
+        for key, (_, objectives) in zip(variables, results):
+            for solution in pending[key]:
+                solution.objectives = list(objectives)
+            if cache is not None:
+                cache.put(key, objectives)
+
+        return solution_list
+
+    def shutdown(self):
+        self.pool.shutdown()
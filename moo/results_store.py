@@ -0,0 +1,101 @@
+import os
+import sqlite3
+import time
+
+import pandas as pd
+
+from moo.optigob_problem import build_json_config
+
+RESULTS_FILE = "moo/results/pareto.db"
+OBJECTIVES = ["co2e", "hnv", "protein", "hwp"]
+
+
+def encode_variables(variables):
+    return ",".join(str(int(v)) for v in variables)
+
+
+def decode_variables(text):
+    return [int(v) for v in text.split(",")]
+
+
+def get_config(variables):
+    # json config of a stored (healed) decision vector, rebuilt on demand
+    if isinstance(variables, str):
+        variables = decode_variables(variables)
+    return build_json_config(list(variables))
+
+
+class ResultsStore:
+    """
+    Append-only SQLite store of the Pareto front of every generation of a run.
+
+    Each row holds the generation, the position within the generation's front, the objectives and the
+    healed decision vector. Rows are buffered and written in one transaction per flush, readers can
+    fetch only the generations added since their last read.
+    """
+
+    def __init__(self, file_path=RESULTS_FILE, buffer_size=1000):
+        self.file_path = file_path
+        self.buffer_size = buffer_size
+        self.buffer = []
+
+        directory = os.path.dirname(self.file_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.conn = sqlite3.connect(self.file_path, check_same_thread=False)
+        # readers (the evaluation page) do not block the optimisation writing to the store
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        with self.conn:
+            self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            self.conn.execute("CREATE TABLE IF NOT EXISTS pareto (generation INTEGER, idx INTEGER, "
+                              "co2e REAL, hnv REAL, protein REAL, hwp REAL, variables TEXT, "
+                              "PRIMARY KEY (generation, idx))")
+            self.conn.execute("INSERT OR IGNORE INTO meta VALUES ('run_id', ?)", (str(time.time_ns()),))
+
+    def append(self, generation, solutions):
+        for idx, (variables, objectives) in enumerate(solutions):
+            self.buffer.append((generation, idx) + tuple(objectives) + (encode_variables(variables),))
+
+        if len(self.buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        if len(self.buffer) == 0:
+            return
+
+        with self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO pareto VALUES (?, ?, ?, ?, ?, ?, ?)", self.buffer)
+        self.buffer = []
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+
+def open_results(file_path=RESULTS_FILE):
+    if not os.path.exists(file_path):
+        return None
+    return sqlite3.connect("file:" + file_path + "?mode=ro", uri=True)
+
+
+def get_run_id(conn):
+    row = conn.execute("SELECT value FROM meta WHERE key = 'run_id'").fetchone()
+    return row[0] if row is not None else None
+
+
+def get_generations(conn):
+    return [row[0] for row in conn.execute("SELECT DISTINCT generation FROM pareto ORDER BY generation")]
+
+
+def load_objectives(conn, after_generation=-1):
+    # objectives of all generations after after_generation, as {generation: DataFrame}
+    df = pd.read_sql_query("SELECT generation, " + ", ".join(OBJECTIVES) + " FROM pareto "
+                           "WHERE generation > ? ORDER BY generation, idx", conn, params=(after_generation,))
+    return {int(generation): group[OBJECTIVES].reset_index(drop=True) for generation, group in df.groupby("generation")}
+
+
+def load_generation(conn, generation):
+    # objectives and decision vectors of one generation
+    return pd.read_sql_query("SELECT " + ", ".join(OBJECTIVES) + ", variables FROM pareto "
+                             "WHERE generation = ? ORDER BY idx", conn, params=(generation,))
@@ -1,11 +1,13 @@
 import os
-import re
 import pandas as pd
 import matplotlib.pyplot as plt
 import matplotlib.cm as cm
 import numpy as np
 from itertools import combinations
 
+from moo.hypervolume import hypervolume
+from moo.results_store import open_results, load_objectives
+
 RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
 
 OBJECTIVES = ["co2e", "hnv", "protein", "hwp"]
@@ -18,15 +20,13 @@ LABELS = {
 
 
 def load_all_generations() -> dict[int, pd.DataFrame]:
-    pattern = re.compile(r"gen(\d+)_pareto\.csv$")
-    generations = {}
-    for fname in os.listdir(RESULTS_DIR):
-        m = pattern.match(fname)
-        if m:
-            gen = int(m.group(1))
-            df = pd.read_csv(os.path.join(RESULTS_DIR, fname), usecols=OBJECTIVES)
-            generations[gen] = df
-    return dict(sorted(generations.items()))
+    conn = open_results(os.path.join(RESULTS_DIR, "pareto.db"))
+    if conn is None:
+        return {}
+    try:
+        return load_objectives(conn)
+    finally:
+        conn.close()
 
 
 def plot_final_pareto(df: pd.DataFrame, generation: int) -> None:
@@ -108,56 +108,12 @@ def plot_parallel_coordinates(df: pd.DataFrame, generation: int) -> None:
     plt.show()
 
 
-def _hv_dominates(p: list, q: list) -> bool:
-    """Return True if p strictly dominates q in a minimization sense."""
-    return all(p[i] <= q[i] for i in range(len(p))) and any(p[i] < q[i] for i in range(len(p)))
-
-
-def _hv_update_nd(nd_set: list, point: list) -> list:
-    """Add point to nd_set while maintaining non-dominance. Returns updated set."""
-    for p in nd_set:
-        if _hv_dominates(p, point) or p == point:
-            return nd_set
-    return [p for p in nd_set if not _hv_dominates(point, p)] + [point]
-
-
-def _hv_recursive(points: list, ref: list) -> float:
-    """
-    WFG slice hypervolume algorithm (minimization).
-    Sorts by last objective, slices into layers, recurses on projected non-dominated sets.
-    """
-    if not points:
-        return 0.0
-
-    d = len(ref)
-    if d == 1:
-        return ref[0] - min(p[0] for p in points)
-
-    pts_sorted = sorted(points, key=lambda p: p[-1])  # ascending last dim
-
-    hv = 0.0
-    nd_projected: list = []
-
-    for i, p in enumerate(pts_sorted):
-        nd_projected = _hv_update_nd(nd_projected, p[:-1])
-        next_val = pts_sorted[i + 1][-1] if i + 1 < len(pts_sorted) else ref[-1]
-        height = next_val - p[-1]
-        if height > 0:
-            hv += height * _hv_recursive(nd_projected, ref[:-1])
-
-    return hv
-
-
 def compute_hypervolume(df: pd.DataFrame, ref_point: list[float]) -> float:
     """
     Compute the hypervolume indicator for a Pareto front (minimization, normalised space).
     Points that exceed the reference in any objective are excluded.
     """
-    pts = df[OBJECTIVES].values.tolist()
-    valid = [p for p in pts if all(p[i] <= ref_point[i] for i in range(len(ref_point)))]
-    if not valid:
-        return 0.0
-    return _hv_recursive(valid, ref_point)
+    return hypervolume(df[OBJECTIVES].values, ref_point)
 
 
 def plot_hypervolume(generations: dict[int, pd.DataFrame]) -> None:
@@ -245,7 +201,7 @@ def plot_population_size(generations: dict[int, pd.DataFrame]) -> None:
 def main() -> None:
     generations = load_all_generations()
     if not generations:
-        print(f"No generation CSV files found in {RESULTS_DIR}")
+        print(f"No optimisation results found in {RESULTS_DIR}")
         return
 
     final_gen = max(generations.keys())
@@ -0,0 +1,151 @@
+import numpy as np
+import pandas as pd
+
+from configuration.keys import *
+from resource_manager.database_manager import DatabaseManager
+
+from .config_hash import get_config_hash
+from .optigob import Optigob
+
+PARAMETERS = [CO2E, AREA, PROTEIN, BIO_ENERGY, HWP, SUBSTITUTION, BIODIVERSITY]
+
+
+def copy_result(result):
+    if isinstance(result, dict):
+        return {key: list(value) if isinstance(value, list) else value for key, value in result.items()}
+    if isinstance(result, list):
+        return list(result)
+    return result.copy()
+
+
+class BatchDatabaseManager(DatabaseManager):
+    # memoises every getter by its arguments for the lifetime of a batch, so scenarios issuing the
+    # same query (including the afforestation scaling and AD time shifts) share one result
+
+    def __init__(self, database_path):
+        super().__init__(database_path)
+        self.results = {}
+        self.hits = 0
+        self.misses = 0
+
+    def memoise(self, getter, *args, **kwargs):
+        key = (getter, args, tuple(sorted(kwargs.items())))
+        if key in self.results:
+            self.hits += 1
+        else:
+            self.misses += 1
+            self.results[key] = getattr(super(), getter)(*args, **kwargs)
+        return copy_result(self.results[key])
+
+    def get_existing_forest_data(self, *args, **kwargs):
+        return self.memoise("get_existing_forest_data", *args, **kwargs)
+
+    def get_afforestation_data(self, *args, **kwargs):
+        return self.memoise("get_afforestation_data", *args, **kwargs)
+
+    def get_nz_metrics(self, *args, **kwargs):
+        return self.memoise("get_nz_metrics", *args, **kwargs)
+
+    def get_agriculture_data(self, *args, **kwargs):
+        return self.memoise("get_agriculture_data", *args, **kwargs)
+
+    def get_scalers(self):
+        return self.memoise("get_scalers")
+
+    def get_organic_soils(self, *args, **kwargs):
+        return self.memoise("get_organic_soils", *args, **kwargs)
+
+    def get_ad_emissions(self, *args, **kwargs):
+        return self.memoise("get_ad_emissions", *args, **kwargs)
+
+
+class BatchResult:
+    """
+    Columnar results of a batch of scenarios.
+
+    values[parameter] is an array of shape (scenario, label, year) with the series listed in
+    labels[parameter]. Series a scenario does not produce (e.g. AD when it is not implemented) are 0,
+    years outside a scenario's horizon are NaN.
+    """
+
+    def __init__(self, years, labels, values):
+        self.years = years
+        self.labels = labels
+        self.values = values
+
+    def get(self, parameter, label):
+        return self.values[parameter][:, self.labels[parameter].index(label), :]
+
+    def get_objective(self, parameter, filter="total_"):
+        # per-scenario sum over all years of the series whose label contains filter, as moo.optigob_problem.get_objective
+        columns = [i for i, label in enumerate(self.labels[parameter]) if filter in label]
+        return np.nansum(self.values[parameter][:, columns, :], axis=(1, 2))
+
+    def to_frame(self):
+        frames = []
+        for parameter, values in self.values.items():
+            n_scenarios, n_labels, n_years = values.shape
+            frames.append(pd.DataFrame({
+                "scenario": np.repeat(np.arange(n_scenarios), n_labels * n_years),
+                "parameter": parameter,
+                "label": np.tile(np.repeat(np.array(self.labels[parameter], dtype=object), n_years), n_scenarios),
+                "year": np.tile(self.years, n_scenarios * n_labels),
+                "value": values.reshape(-1),
+            }))
+        return pd.concat(frames, ignore_index=True)
+
+
+def evaluate_batch(scenarios, db_file_path, parameters=None, config_builder=None, array_backed=False):
+    """
+    Runs a batch of scenarios and collects their evaluations in a BatchResult.
+
+    scenarios is a list of json configs, or a DataFrame / list of decision vectors together with a
+    config_builder that turns one vector into a json config (e.g. moo.optigob_problem.build_json_config).
+    Identical scenarios are only simulated once and all scenarios share the database lookups.
+    """
+    if parameters is None:
+        parameters = PARAMETERS
+
+    if isinstance(scenarios, pd.DataFrame):
+        scenarios = scenarios.values.tolist()
+    if config_builder is not None:
+        scenarios = [config_builder(s) for s in scenarios]
+
+    db_manager = BatchDatabaseManager(db_file_path)
+    evaluations = {}
+    scenario_keys = []
+    for config in scenarios:
+        key = get_config_hash(config)
+        scenario_keys.append(key)
+        if key in evaluations:
+            continue
+
+        optigob = Optigob(json_config=config, db_file_path=db_file_path, array_backed=array_backed, db_manager=db_manager)
+        optigob.run()
+        evaluations[key] = (optigob.baseline_year, {p: optigob.get_evaluation(p) for p in parameters})
+
+    baseline_year = min(config[BASELINE_YEAR] for config in scenarios)
+    target_year = max(config[TARGET_YEAR] for config in scenarios)
+    years = np.arange(baseline_year, target_year + 1)
+
+    labels = {}
+    for p in parameters:
+        labels[p] = []
+        for (_, evaluation) in evaluations.values():
+            for (label, _) in evaluation[p]:
+                if label not in labels[p]:
+                    labels[p].append(label)
+
+    values = {}
+    for p in parameters:
+        values[p] = np.full((len(scenarios), len(labels[p]), len(years)), np.nan)
+        for i, key in enumerate(scenario_keys):
+            (scenario_baseline_year, evaluation) = evaluations[key]
+            config = scenarios[i]
+            start = scenario_baseline_year - baseline_year
+            length = config[TARGET_YEAR] - config[BASELINE_YEAR] + 1
+            values[p][i, :, start:start + length] = 0.0
+            for (label, series) in evaluation[p]:
+                values[p][i, labels[p].index(label), start:start + length] = series[:length]
+
+    return BatchResult(years=years, labels=labels, values=values)
@@ -0,0 +1,70 @@
+import hashlib
+import json
+import math
+
+import numpy as np
+
+from configuration.keys import *
+from optigob.metrics import DEFAULT_METRIC
+from optigob.utils import sort_waypoints
+
+# canonical form of a json config: configs that simulate the same scenario have the same canonical form and hash,
+# whatever their key order, number formatting (1 vs 1.0, numpy scalars), waypoint order or omitted defaults
+HASH_VERSION = 1
+
+
+def normalise_value(value):
+    if isinstance(value, dict):
+        return {str(key): normalise_value(v) for key, v in value.items()}
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [normalise_value(v) for v in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, bool) or value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (int, float)):
+        if not math.isfinite(value):
+            raise ValueError(f"config value {value} is not a finite number")
+        # integral numbers as int, so 1, 1.0 and np.int64(1) are the same
+        return int(value) if float(value).is_integer() else float(value)
+    raise TypeError(f"config value {value!r} of type {type(value).__name__} is not json")
+
+
+def normalise_systems(systems):
+    if isinstance(systems, dict):
+        systems = dict(systems)
+        if WAY_POINTS in systems:
+            systems[WAY_POINTS] = sort_waypoints(systems[WAY_POINTS])
+        return systems
+    return [normalise_systems(s) for s in systems]
+
+
+def canonicalise_config(config):
+    """
+    Canonical copy of a json config, used as the identity of a scenario in caches and batches.
+
+    Numbers are normalised, waypoints sorted by year, defaults filled in (the co2e metric, empty
+    organic soil waypoints).
+    """
+    config = normalise_value(config)
+    config.setdefault(CO2E_METRIC, DEFAULT_METRIC)
+
+    for key, value in config.items():
+        if key in [FORESTRY, NON_CATTLE_AGRICULTURE, CATTLE_AGRICULTURE, ORGANIC_SOILS]:
+            config[key] = normalise_systems(value)
+    for s in config.get(ORGANIC_SOILS, []):
+        s.setdefault(WAY_POINTS, [])
+
+    return config
+
+
+def dump_config(config):
+    # the same text on every platform and python version: sorted keys, no whitespace, ascii only,
+    # floats as their shortest round-trip repr
+    return json.dumps(canonicalise_config(config), sort_keys=True, separators=(",", ":"), ensure_ascii=True,
+                      allow_nan=False)
+
+
+def get_config_hash(config):
+    text = f"{HASH_VERSION}:" + dump_config(config)
+    return hashlib.sha256(text.encode("ascii")).hexdigest()
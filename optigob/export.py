@@ -0,0 +1,260 @@
+import csv
+import io
+import zipfile
+
+import numpy as np
+from openpyxl import Workbook
+from openpyxl.utils import get_column_letter
+from openpyxl.worksheet.table import Table, TableColumn, TableStyleInfo
+
+FORMATS = ["xlsx", "csv", "npz"]
+# fields: one sheet per field with a column per series and a row per year (the download of the evaluation page)
+# wide: one row per series and a column per year
+# long: one row per series and year
+LAYOUTS = ["fields", "wide", "long"]
+SERIES_COLUMNS = ["scenario", "field", "system", "parameter"]
+EXCEL_MAX_ROWS = 1048576
+
+
+def iter_series(optigob):
+    # (field, system, parameter, values) of every time series, values as stored by the system
+    for f in optigob.fields:
+        for s in f.systems:
+            for p in s.time_series.keys():
+                yield f.name, s.name, p, s.time_series[p]
+
+
+def iter_scenarios(scenarios):
+    # an Optigob, or an iterable of Optigobs or (name, Optigob) pairs, consumed lazily
+    if hasattr(scenarios, "fields"):
+        scenarios = [scenarios]
+    for i, scenario in enumerate(scenarios):
+        if isinstance(scenario, tuple):
+            yield scenario
+        else:
+            yield i, scenario
+
+
+def run_scenarios(configs, db_file_path, names=None):
+    # simulates json configs one at a time for a batch export, sharing the database lookups between them
+    from optigob.batch import BatchDatabaseManager
+    from optigob.optigob import Optigob
+
+    db_manager = BatchDatabaseManager(db_file_path)
+    for i, config in enumerate(configs):
+        optigob = Optigob(json_config=config, db_file_path=db_file_path, db_manager=db_manager)
+        optigob.run()
+        yield (i if names is None else names[i]), optigob
+
+
+def is_numeric(values):
+    if isinstance(values, np.ndarray):
+        return True
+    return not any(isinstance(v, str) for v in values)
+
+
+def get_row(optigob, values, years):
+    # values aligned to years, blank outside the scenario's horizon
+    row = []
+    for year in years:
+        i = year - optigob.baseline_year
+        row.append(values[i] if 0 <= i < len(values) and year <= optigob.target_year else "")
+    return row
+
+
+class CsvWriter:
+    def __init__(self, file):
+        self.close_file = isinstance(file, str)
+        self.file = open(file, "w", newline="") if self.close_file else file
+        self.writer = csv.writer(self.file)
+
+    def write_header(self, header):
+        self.writer.writerow(header)
+
+    def write_row(self, row):
+        self.writer.writerow(row)
+
+    def close(self):
+        if self.close_file:
+            self.file.close()
+
+
+class XlsxWriter:
+    # write-only workbook, rows are streamed to disk instead of being kept as cells;
+    # continues on a new sheet when a sheet is full
+    def __init__(self, file, sheet_name="time_series"):
+        self.file = file
+        self.sheet_name = sheet_name
+        self.workbook = Workbook(write_only=True)
+        self.header = None
+        self.sheet = None
+        self.rows = 0
+
+    def write_header(self, header):
+        self.header = header
+
+    def write_row(self, row):
+        if self.sheet is None or self.rows == EXCEL_MAX_ROWS:
+            n = len(self.workbook.worksheets)
+            self.sheet = self.workbook.create_sheet(self.sheet_name if n == 0 else f"{self.sheet_name}_{n + 1}")
+            self.sheet.append(self.header)
+            self.rows = 1
+        self.sheet.append(row)
+        self.rows += 1
+
+    def close(self):
+        if self.sheet is None:
+            self.workbook.create_sheet(self.sheet_name).append(self.header)
+        self.workbook.save(self.file)
+
+
+def get_writer(file, format):
+    if format == "csv":
+        return CsvWriter(file)
+    if format == "xlsx":
+        return XlsxWriter(file)
+    raise ValueError(f"unknown format {format}, expected one of {FORMATS}")
+
+
+def write_long(scenarios, writer):
+    writer.write_header(SERIES_COLUMNS + ["year", "value"])
+    for name, optigob in iter_scenarios(scenarios):
+        years = range(optigob.baseline_year, optigob.target_year + 1)
+        for (field, system, parameter, values) in iter_series(optigob):
+            for year, value in zip(years, values):
+                writer.write_row([name, field, system, parameter, year, value])
+
+
+def write_wide(scenarios, writer, years=None):
+    if years is not None:
+        years = list(years)
+        writer.write_header(SERIES_COLUMNS + years)
+
+    for name, optigob in iter_scenarios(scenarios):
+        if years is None:
+            # without given years the columns follow the first scenario
+            years = list(range(optigob.baseline_year, optigob.target_year + 1))
+            writer.write_header(SERIES_COLUMNS + years)
+        if optigob.baseline_year < years[0] or optigob.target_year > years[-1]:
+            raise ValueError(f"scenario {name} runs from {optigob.baseline_year} to {optigob.target_year}, "
+                             f"pass years covering all scenarios")
+        for (field, system, parameter, values) in iter_series(optigob):
+            writer.write_row([name, field, system, parameter] + get_row(optigob, values, years))
+
+    if years is None:
+        writer.write_header(SERIES_COLUMNS)
+
+
+def get_unique_names(header):
+    # table column names must be unique in Excel
+    names, seen = [], {}
+    for value in header:
+        value = str(value)
+        seen[value] = seen.get(value, 0) + 1
+        names.append(value if seen[value] == 1 else f"{value}{seen[value]}")
+    return names
+
+
+def write_fields(optigob, file):
+    workbook = Workbook(write_only=True)
+    years = range(optigob.baseline_year, optigob.target_year + 1)
+
+    for f in optigob.fields:
+        sheet = workbook.create_sheet(title=f.name)
+        series = [(s.name, p, s.time_series[p]) for s in f.systems for p in s.time_series.keys()]
+
+        header = ["System"] + [name for (name, _, _) in series]
+        table = Table(displayName=f"Table_{f.name}", ref=f"A1:{get_column_letter(len(header))}{3 + len(years)}")
+        # write-only sheets cannot read the header back, so the table columns are given up front and the table
+        # is added to the sheet's tables directly (add_table warns in write-only mode whatever the columns)
+        table.tableColumns = [TableColumn(id=i, name=name) for i, name in enumerate(get_unique_names(header), 1)]
+        table.tableStyleInfo = TableStyleInfo(
+            name="TableStyleMedium9",
+            showRowStripes=True,
+            showColumnStripes=False
+        )
+        sheet.tables.add(table)
+
+        sheet.append(header)
+        sheet.append(["Parameter"] + [p for (_, p, _) in series])
+        sheet.append(["Year"] + [""] * len(series))
+        for idx, year in enumerate(years):
+            sheet.append([str(year)] + [values[idx] for (_, _, values) in series])
+
+    workbook.save(file)
+
+
+def write_npz(scenarios, file):
+    # columnar and compressed, one set of arrays per scenario written as it comes:
+    # {i}_keys (field, system, parameter) and {i}_values (series x years) for numeric series,
+    # {i}_years, {i}_units (field, system, parameter, value) for text series, and the scenario names
+    names = []
+    with zipfile.ZipFile(file, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        def write_array(name, array):
+            with archive.open(name + ".npy", "w", force_zip64=True) as f:
+                np.lib.format.write_array(f, np.asanyarray(array), allow_pickle=False)
+
+        for i, (name, optigob) in enumerate(iter_scenarios(scenarios)):
+            names.append(str(name))
+            n_years = optigob.target_year - optigob.baseline_year + 1
+            keys, values, units = [], [], []
+            for (field, system, parameter, series) in iter_series(optigob):
+                if is_numeric(series):
+                    row = np.full(n_years, np.nan)
+                    row[:min(len(series), n_years)] = np.asarray(series[:n_years], dtype=np.float64)
+                    keys.append((field, system, parameter))
+                    values.append(row)
+                else:
+                    units.append((field, system, parameter, series[0] if len(series) > 0 else ""))
+
+            write_array(f"{i}_years", np.arange(optigob.baseline_year, optigob.target_year + 1))
+            write_array(f"{i}_keys", np.array(keys, dtype=str).reshape(-1, 3))
+            write_array(f"{i}_values", np.array(values, dtype=np.float64).reshape(-1, n_years))
+            write_array(f"{i}_units", np.array(units, dtype=str).reshape(-1, 4))
+
+        write_array("scenarios", np.array(names, dtype=str))
+
+
+def load_npz(file):
+    # {scenario name: (years, keys, values, units)} of a file written by write_npz
+    with np.load(file) as data:
+        return {name: tuple(data[f"{i}_{member}"] for member in ["years", "keys", "values", "units"])
+                for i, name in enumerate(data["scenarios"])}
+
+
+def export_time_series(scenarios, file=None, format="xlsx", layout="fields", years=None):
+    """
+    Writes the time series of one scenario or a batch of scenarios to file (a path or a binary stream,
+    a text stream for csv), or to a new BytesIO / StringIO that is returned.
+
+    scenarios is an Optigob that has been run, or an iterable of them or of (name, Optigob) pairs, e.g.
+    run_scenarios(configs, db_file_path) to simulate a batch while it is being written. Rows are written
+    as each scenario comes, so only one scenario needs to be held in memory. The fields layout is the
+    spreadsheet of a single scenario, npz is always columnar.
+    """
+    if format not in FORMATS:
+        raise ValueError(f"unknown format {format}, expected one of {FORMATS}")
+    if layout not in LAYOUTS:
+        raise ValueError(f"unknown layout {layout}, expected one of {LAYOUTS}")
+
+    buffer = None
+    if file is None:
+        buffer = file = io.StringIO() if format == "csv" else io.BytesIO()
+
+    if format == "npz":
+        write_npz(scenarios, file)
+    elif layout == "fields":
+        if format != "xlsx" or not hasattr(scenarios, "fields"):
+            raise ValueError("the fields layout is only available for a single scenario in xlsx")
+        write_fields(scenarios, file)
+    else:
+        writer = get_writer(file, format)
+        if layout == "long":
+            write_long(scenarios, writer)
+        else:
+            write_wide(scenarios, writer, years)
+        writer.close()
+
+    if buffer is not None:
+        buffer.seek(0)
+    return buffer
@@ -0,0 +1,76 @@
+from functools import lru_cache
+
+import numpy as np
+
+from optigob.net_zero import GWP100, apply_weights
+
+# CO2e metrics by name, each turning (CO2, N2O, CH4) series into CO2e; GASES order as in optigob.net_zero
+# the metric only weights emissions for the evaluations, the simulation itself (e.g. co2e waypoint scalers and
+# the cattle budget) always uses the default weights, so switching the metric of a run does not re-simulate it
+DEFAULT_METRIC = "default"
+METRICS = {}
+
+
+class GWP100Metric:
+    # one constant weight per gas
+    def __init__(self, name, co2, n2o, ch4):
+        self.name = name
+        self.gwp = np.array([co2, n2o, ch4], dtype=np.float64)
+
+    def get_weights(self, n_years):
+        return self.gwp
+
+
+class GWPStarMetric:
+    # GWP* with the coefficients of Cain et al. 2019 (Smith et al. 2021 use flow 4.53 and stock 4.25):
+    # warming-equivalent CH4 emissions from the change of the emission rate,
+    # E*(t) = GWP100 * (flow * E(t) - stock * E(t - delay)), emissions before the first year of the series
+    # are taken to be those of the first year; CO2 and N2O keep their GWP100 weights
+    def __init__(self, name, base, flow=4.0, stock=3.75, delay=20):
+        self.name = name
+        self.base = base
+        self.flow = flow
+        self.stock = stock
+        self.delay = delay
+
+    def get_weights(self, n_years):
+        # one (year, year) matrix per gas, co2e[u] = sum over gases g and years t of weights[g, u, t] * E[g, t]
+        (co2, n2o, ch4) = self.base.gwp
+        weights = np.zeros((3, n_years, n_years))
+        years = np.arange(n_years)
+        weights[0, years, years] = co2
+        weights[1, years, years] = n2o
+        weights[2, years, years] = ch4 * self.flow
+        np.subtract.at(weights[2], (years, np.maximum(years - self.delay, 0)), ch4 * self.stock)
+        return weights
+
+
+def register_metric(metric):
+    METRICS[metric.name] = metric
+    get_weights.cache_clear()
+
+
+def get_metric(name):
+    if name not in METRICS:
+        raise KeyError(f"unknown CO2e metric {name}, expected one of {list(METRICS.keys())}")
+    return METRICS[name]
+
+
+@lru_cache(maxsize=64)
+def get_weights(name, n_years):
+    # weighting vector or matrices of a metric for series of n_years, shared and read-only
+    weights = np.array(get_metric(name).get_weights(n_years), dtype=np.float64)
+    weights.flags.writeable = False
+    return weights
+
+
+def apply_metric(co2, n2o, ch4, co2e_metric=DEFAULT_METRIC):
+    emissions = np.array([co2, n2o, ch4], dtype=np.float64)
+    return apply_weights(emissions, get_weights(co2e_metric, emissions.shape[1]))
+
+
+register_metric(GWP100Metric(DEFAULT_METRIC, *GWP100))
+register_metric(GWP100Metric("AR4", co2=1.0, n2o=298.0, ch4=25.0))
+register_metric(GWP100Metric("AR5", co2=1.0, n2o=265.0, ch4=28.0))
+register_metric(GWP100Metric("AR6", co2=1.0, n2o=273.0, ch4=27.0))
+register_metric(GWPStarMetric("GWP*", base=METRICS[DEFAULT_METRIC]))
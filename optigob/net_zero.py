@@ -0,0 +1,73 @@
+import numpy as np
+
+from configuration.keys import *
+
+# gases in the order of the rows of the emissions array and of System.get_net_zero
+GASES = [CO2, N2O, CH4]
+# GWP100 weights the model has always used, see optigob.utils.transform_to_c02e
+GWP100 = np.array([1.0, 260.0, 25.0])
+
+
+def get_emissions(optigob):
+    # (systems, emissions) with emissions[s, g, t] the emissions of gas g of system s in year t of the run
+    time_span = optigob.target_year - optigob.baseline_year + 1
+    systems = []
+    rows = []
+    for f in optigob.fields:
+        for s in f.systems:
+            gases = s.get_net_zero(time_span)
+            for gas, values in zip(GASES, gases):
+                if len(values) < time_span:
+                    raise ValueError(f"{gas} of {f.name}/{s.name} has {len(values)} years, the run has {time_span}")
+            systems.append((f.name, s.name))
+            rows.append([np.asarray(values[:time_span], dtype=np.float64) for values in gases])
+
+    emissions = np.array(rows, dtype=np.float64).reshape(len(systems), len(GASES), time_span)
+    return systems, emissions
+
+
+def apply_weights(emissions, weights):
+    """
+    CO2e of emissions[..., gas, year] as one product with the weights of the gases.
+
+    weights is a vector with one weight per gas (e.g. GWP100), or one (year, year) matrix per gas for
+    metrics that depend on earlier emissions, where co2e[u] = sum over gases g and years t of
+    weights[g, u, t] * emissions[g, t].
+    """
+    weights = np.asarray(weights, dtype=np.float64)
+    if weights.ndim == 1:
+        return np.einsum("...gt,g->...t", emissions, weights)
+    return np.einsum("...gt,gut->...u", emissions, weights)
+
+
+class NetZeroResult:
+    """
+    Net zero accounting of a run: emissions[system, gas, year] of all systems and their CO2e.
+
+    split_gas is the CO2e of CO2 and N2O only, methane is reported separately as ch4.
+    """
+
+    def __init__(self, years, systems, emissions, weights=GWP100):
+        self.years = years
+        self.systems = systems
+        self.emissions = emissions
+        self.weights = np.asarray(weights, dtype=np.float64)
+
+        totals = emissions.sum(axis=0)
+        self.co2e_by_system = apply_weights(emissions, self.weights)
+        self.co2e = apply_weights(totals, self.weights)
+
+        split_weights = self.weights.copy()
+        split_weights[GASES.index(CH4)] = 0.0
+        self.split_gas = apply_weights(totals, split_weights)
+        self.ch4 = totals[GASES.index(CH4)]
+
+    def get_contributions(self):
+        # CO2e per system, labelled like the evaluation series
+        return [(system, co2e.tolist()) for ((_, system), co2e) in zip(self.systems, self.co2e_by_system)]
+
+
+def compute_net_zero(optigob, weights=GWP100):
+    (systems, emissions) = get_emissions(optigob)
+    years = np.arange(optigob.baseline_year, optigob.target_year + 1)
+    return NetZeroResult(years, systems, emissions, weights)
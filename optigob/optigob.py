@@ -1,8 +1,6 @@
+import copy
+
 from matplotlib import pyplot as plt
-from io import BytesIO
-from openpyxl import Workbook
-from openpyxl.utils import get_column_letter
-from openpyxl.worksheet.table import Table, TableStyleInfo
 
 from configuration.keys import *
 
@@ -13,76 +11,192 @@ from .systems.forestry import Forestry
 from .systems.non_cattle_agriculture import NonCattleAgriculture
 from .systems.organic_soils import OrganicSoils
 from .systems.ad_emissions import AnaerobicDigestion
-from .utils import add_two_lists, transform_to_c02e
-
-
-class Optigob:
-
-    def __init__(self, json_config, db_file_path):
-        self.baseline_year = json_config[BASELINE_YEAR]
-        self.target_year = json_config[TARGET_YEAR]
-        self.fields = []
-        self.db_manager = DatabaseManager(db_file_path)
+from . import export, metrics, net_zero, profiling
+from .time_series import TimeSeries
+from .utils import to_list
 
-        if FORESTRY in json_config:
-            self.fields.append(Forestry(json_config[FORESTRY]))
 
-        if NON_CATTLE_AGRICULTURE in json_config:
-            self.fields.append(NonCattleAgriculture(json_config[NON_CATTLE_AGRICULTURE]))
+# field classes in the order in which the fields are run
+FIELD_TYPES = {
+    FORESTRY: Forestry,
+    NON_CATTLE_AGRICULTURE: NonCattleAgriculture,
+    CATTLE_AGRICULTURE: CattleAgriculture,
+    ORGANIC_SOILS: OrganicSoils,
+    AD_EMISSIONS: AnaerobicDigestion,
+}
 
-        if CATTLE_AGRICULTURE in json_config:
-            self.fields.append((CattleAgriculture(json_config[CATTLE_AGRICULTURE])))
+# fields whose results depend on other fields
+# cattle: budget allocation against non cattle agriculture, spared area against sheep/afforestation/AD
+# organic soils: drained area balanced against the afforestation organic soil area
+FIELD_DEPENDENCIES = {
+    CATTLE_AGRICULTURE: [NON_CATTLE_AGRICULTURE, FORESTRY, AD_EMISSIONS],
+    ORGANIC_SOILS: [FORESTRY],
+}
 
-        if ORGANIC_SOILS in json_config:
-            self.fields.append(OrganicSoils(json_config[ORGANIC_SOILS]))
 
-        if AD_EMISSIONS in json_config:
-            self.fields.append(AnaerobicDigestion(json_config[AD_EMISSIONS]))
-
-        for fi in self.fields:
-            fi.load_data(self.db_manager)
-
-        self.apply_scalers()
+class Optigob:
 
-    def apply_scalers(self):
-        scalers = self.db_manager.get_scalers()
-        for fi in self.fields:
+    def __init__(self, json_config, db_file_path, array_backed=False, db_manager=None):
+        self.baseline_year = json_config[BASELINE_YEAR]
+        self.target_year = json_config[TARGET_YEAR]
+        self.db_manager = db_manager if db_manager is not None else DatabaseManager(db_file_path)
+        self.co2e_metric = json_config.get(CO2E_METRIC, metrics.DEFAULT_METRIC)
+        metrics.get_metric(self.co2e_metric)
+
+        # kept to diff against in update_config
+        self.json_config = copy.deepcopy(json_config)
+        self.fields = [self.create_field(name) for name in FIELD_TYPES if name in self.json_config]
+
+        self.array_backed = array_backed
+        # evaluations of the current run by parameter, computed on first access
+        self.evaluations = {}
+        self.cumulative_totals = {}
+        self.reload()
+
+    # (re)initialises the time series of all systems from the database, so that a model whose system
+    # parameters were changed in place can be run again without being rebuilt
+    def reload(self, fields=None):
+        if fields is None:
+            fields = self.fields
+
+        self.invalidate_evaluations()
+        for fi in fields:
+            with profiling.timer("load_data", fi.name):
+                fi.load_data(self.db_manager)
+
+        with profiling.timer("apply_scalers"):
+            self.apply_scalers(fields)
+
+        # opt-in numpy time series, filled by vectorised interpolation from here on
+        if self.array_backed:
+            for fi in fields:
+                for system in fi.systems:
+                    system.time_series = TimeSeries.from_dict(system.time_series, self.baseline_year, self.target_year)
+
+    # the field constructors modify their part of the config, so they get a copy of it
+    def create_field(self, name):
+        return FIELD_TYPES[name](copy.deepcopy(self.json_config[name]))
+
+    # fields whose config changed, together with all fields depending on them
+    @staticmethod
+    def get_dirty_fields(changed):
+        dirty = set(changed)
+        while True:
+            dependants = {name for (name, dependencies) in FIELD_DEPENDENCIES.items() if dirty.intersection(dependencies)}
+            if dependants.issubset(dirty):
+                return dirty
+            dirty.update(dependants)
+
+    # re-simulates a model that has been run for a new config, only rebuilding the fields whose config
+    # changed and the fields depending on them, all other fields keep their time series
+    def update_config(self, json_config):
+        new_config = copy.deepcopy(json_config)
+        self.set_co2e_metric(new_config.get(CO2E_METRIC, metrics.DEFAULT_METRIC))
+        if new_config[BASELINE_YEAR] != self.baseline_year or new_config[TARGET_YEAR] != self.target_year:
+            self.baseline_year = new_config[BASELINE_YEAR]
+            self.target_year = new_config[TARGET_YEAR]
+            changed = set(FIELD_TYPES)
+        else:
+            changed = {name for name in FIELD_TYPES if new_config.get(name) != self.json_config.get(name)}
+
+        dirty = self.get_dirty_fields(changed)
+        self.json_config = new_config
+
+        fields, dirty_fields = [], []
+        for name in FIELD_TYPES:
+            if name not in new_config:
+                continue
+            if name in dirty:
+                fi = self.create_field(name)
+                dirty_fields.append(fi)
+            else:
+                fi = self.get_field(name)
+            fields.append(fi)
+        self.fields = fields
+
+        self.reload(dirty_fields)
+        self.run(dirty_fields)
+        return [fi.name for fi in dirty_fields]
+
+    @classmethod
+    def evaluate_batch(cls, scenarios, db_file_path, parameters=None, config_builder=None, array_backed=False):
+        # evaluates many scenarios together, see optigob.batch.evaluate_batch
+        from .batch import evaluate_batch
+        return evaluate_batch(scenarios, db_file_path, parameters=parameters, config_builder=config_builder, array_backed=array_backed)
+
+    def apply_scalers(self, fields=None):
+        if fields is None:
+            fields = self.fields
+
+        scaled_systems = self.db_manager.get_derived(("scaled_systems",), lambda: set(self.db_manager.get_scalers().keys()))
+        for fi in fields:
             for system in fi.systems:
-                if system.name in scalers.keys():
-                    for i in range(len(scalers["Year"])):
-                        system.update_by_scaler(scaler=scalers[system.name][i],
-                                                baseline_year=self.baseline_year,
-                                                target_year=scalers["Year"][i])
-
-    def run(self):
-        nca = None
-        for fi in self.fields:
-            fi.run(self.baseline_year, self.target_year, self.db_manager)
-
-            if isinstance(fi, NonCattleAgriculture):
-                nca = fi
+                if system.name in scaled_systems:
+                    # the scaled baseline only depends on the database, the baseline year and the loaded baseline
+                    key = ("scaled_time_series", system.name, system.baseline_abatement, system.baseline_productivity, self.baseline_year)
+                    time_series = self.db_manager.get_derived(key, lambda: self.scale_time_series(system))
+                    system.time_series = {k: list(v) if isinstance(v, list) else v for k, v in time_series.items()}
 
-        for fi in self.fields:
+    def scale_time_series(self, system):
+        scalers = self.db_manager.get_scalers()
+        for i in range(len(scalers["Year"])):
+            system.update_by_scaler(scaler=scalers[system.name][i],
+                                    baseline_year=self.baseline_year,
+                                    target_year=scalers["Year"][i])
+        return system.time_series
+
+    # the metric only weights the gases of the evaluations, the time series of the run stay as they are
+    def set_co2e_metric(self, co2e_metric):
+        metrics.get_metric(co2e_metric)
+        if co2e_metric != self.co2e_metric:
+            self.co2e_metric = co2e_metric
+            self.invalidate_evaluations()
+
+    def invalidate_evaluations(self):
+        self.evaluations = {}
+        self.cumulative_totals = {}
+
+    def run(self, fields=None):
+        if fields is None:
+            fields = self.fields
+
+        self.invalidate_evaluations()
+        for fi in fields:
+            with profiling.timer("run", fi.name):
+                fi.run(self.baseline_year, self.target_year, self.db_manager)
+
+        nca = self.get_field(NON_CATTLE_AGRICULTURE)
+        for fi in fields:
             if isinstance(fi, CattleAgriculture):
-                fi.run_cattle_systems(self.baseline_year, self.target_year, self.db_manager, nca)
+                with profiling.timer("run_cattle_systems", fi.name):
+                    fi.run_cattle_systems(self.baseline_year, self.target_year, self.db_manager, nca)
 
-        self.area_balancing()
+        with profiling.timer("area_balancing"):
+            self.area_balancing(fields)
 
-    def area_balancing(self):
+    def area_balancing(self, fields=None):
         # this function only handles balancing of area within different fields
         # organic soil rewetting balancing in systems.organic_soils.OrganicSoilSystem.run()
         # croplands/no-croplands balancing in systems.non_cattle_agriculture.NonCattleAgriculture.run()
+        # only balancing steps into the given fields are (re)applied, the others are still in place
 
         # beef.area_beef    =>                          => afforestation.area
         # dairy.area_dairy  => spared_sheep_cattle.area => ad.area
         # dairy.area_beef   =>                          => additional_ad.area
         # sheep.area        =>                          => willow_ad.area
-        if self.get_field(CATTLE_AGRICULTURE) is not None:
-            self.balance_spared_sheep_cattle_area()
+        if fields is None:
+            fields = self.fields
+        names = [fi.name for fi in fields]
+
+        self.invalidate_evaluations()
+        if self.get_field(CATTLE_AGRICULTURE) is not None and CATTLE_AGRICULTURE in names:
+            with profiling.timer("balance_spared_sheep_cattle_area", CATTLE_AGRICULTURE):
+                self.balance_spared_sheep_cattle_area()
 
         # organic_soil_under_grass.drained_area => afforestation.organic_soil_area
-        if self.get_field(ORGANIC_SOILS) is not None and self.get_field(ORGANIC_SOILS).get_system(ORGANIC_SOILS_ORGANIC_SOIL_UNDER_GRASS) is not None and self.get_field(FORESTRY) is not None and self.get_field(FORESTRY).get_system(FORESTRY_AFFORESTATION) is not None:
-            self.balance_afforestation_organic_soils()
+        if ORGANIC_SOILS in names and self.get_field(ORGANIC_SOILS).get_system(ORGANIC_SOILS_ORGANIC_SOIL_UNDER_GRASS) is not None and self.get_field(FORESTRY) is not None and self.get_field(FORESTRY).get_system(FORESTRY_AFFORESTATION) is not None:
+            with profiling.timer("balance_afforestation_organic_soils", ORGANIC_SOILS):
+                self.balance_afforestation_organic_soils()
 
     def balance_spared_sheep_cattle_area(self):
         assert self.get_field(CATTLE_AGRICULTURE) is not None
@@ -126,13 +240,38 @@ class Optigob:
             self.get_field(ORGANIC_SOILS).get_system(ORGANIC_SOILS_ORGANIC_SOIL_UNDER_GRASS).area_balance(i, new_area, DRAINED)
 
     def get_evaluation(self, parameter):
+        if parameter not in self.evaluations:
+            with profiling.timer("get_evaluation " + parameter):
+                self.evaluations[parameter] = self.compute_evaluation(parameter)
+
+        # callers get their own lists, the cached evaluation stays untouched
+        return [(label, list(value)) for (label, value) in self.evaluations[parameter]]
+
+    def get_cumulative_total(self, parameter, filter="total_"):
+        # sum over all years of the series whose label contains filter
+        key = (parameter, filter)
+        if key not in self.cumulative_totals:
+            if parameter not in self.evaluations:
+                with profiling.timer("get_evaluation " + parameter):
+                    self.evaluations[parameter] = self.compute_evaluation(parameter)
+
+            total = 0
+            for (label, value) in self.evaluations[parameter]:
+                if filter in label:
+                    for v in value:
+                        total = total + v
+            self.cumulative_totals[key] = total
+
+        return self.cumulative_totals[key]
+
+    def compute_evaluation(self, parameter):
         output_list = []
         time_span = self.target_year - self.baseline_year + 1
 
         for f in self.fields:
             field_list = None
             if parameter == CO2E:
-                field_list = f.get_co2e(time_span)
+                field_list = f.get_co2e(time_span, self.co2e_metric)
             elif parameter == AREA:
                 field_list = f.get_area(time_span)
             elif parameter == PROTEIN:
@@ -147,22 +286,10 @@ class Optigob:
                 field_list = f.get_biodiversity(time_span)
 
             if not field_list is None:
-                output_list.extend(field_list)
-
-        i = 0
-        while i < len(output_list):
-            (label, value) = output_list[i]
-            if sum(value) == 0:
-                rm = True
-                for v in value:
-                    if v != 0.0:
-                        rm = False
-                if rm:
-                    output_list.pop(i)
-                else:
-                    i += 1
-            else:
-                i += 1
+                output_list.extend([(label, to_list(value)) for (label, value) in field_list])
+
+        # drop series that are zero in every year
+        output_list = [(label, value) for (label, value) in output_list if any(v != 0.0 for v in value)]
 
         if parameter == CO2E:
             co2e, co2e_split_gas, total_ch4 = self.get_net_zero_calculations()
@@ -174,20 +301,8 @@ class Optigob:
 
     def get_net_zero_calculations(self):
         time_span = self.target_year - self.baseline_year + 1
-        total_co2, total_n2o, total_ch4 = [], [], []
-        for f in self.fields:
-            (co2, n2o, ch4) = f.get_net_zero(time_span=time_span)
-            total_co2 = add_two_lists(total_co2, co2)
-            total_n2o = add_two_lists(total_n2o, n2o)
-            total_ch4 = add_two_lists(total_ch4, ch4)
-
-        co2e = []
-        co2e_split_gas = []
-        for i in range(time_span):
-            co2e.append(transform_to_c02e(co2=total_co2[i], n2o=total_n2o[i], ch4=total_ch4[i]))
-            co2e_split_gas.append(transform_to_c02e(co2=total_co2[i], n2o=total_n2o[i], ch4=0))
-
-        return co2e, co2e_split_gas, total_ch4
+        result = net_zero.compute_net_zero(self, metrics.get_weights(self.co2e_metric, time_span))
+        return result.co2e.tolist(), result.split_gas.tolist(), result.ch4.tolist()
 
     def get_field(self, name):
         for f in self.fields:
@@ -225,49 +340,7 @@ class Optigob:
         plt.legend()
         plt.show()
 
-    def export_time_series(self):
-        wb = Workbook()
-        # Remove default sheet (optional, cleaner)
-        wb.remove(wb.active)
-
-        for f in self.fields:
-            sheet = wb.create_sheet(title=f.name)
-
-            data = [["System"], ["Parameter"], ["Year"]]
-            for i in range(self.baseline_year, self.target_year + 1):
-                data.append([str(i)])
-
-            for s in f.systems:
-                for p in s.time_series.keys():
-                    data[0].append(s.name)
-                    data[1].append(p)
-                    data[2].append("")
-                    for i in range(self.baseline_year, self.target_year + 1):
-                        idx = i - self.baseline_year
-                        data[3+idx].append(s.time_series[p][idx])
-
-            # ---- write data to sheet ----
-            for row in data:
-                sheet.append(row)
-
-            # ---- create dynamic table ----
-            max_row = sheet.max_row
-            max_col = sheet.max_column
-
-            table_ref = f"A1:{get_column_letter(max_col)}{max_row}"
-
-            table = Table(displayName=f"Table_{f.name}", ref=table_ref)
-
-            table.tableStyleInfo = TableStyleInfo(
-                name="TableStyleMedium9",
-                showRowStripes=True,
-                showColumnStripes=False
-            )
-
-            sheet.add_table(table)
-
-        # Save to memory
-        buffer = BytesIO()
-        wb.save(buffer)
-        buffer.seek(0)
-        return buffer
+    # spreadsheet of all time series as a BytesIO, or written to file; see optigob.export for the other
+    # formats and layouts and for batches of scenarios
+    def export_time_series(self, file=None, format="xlsx", layout="fields"):
+        return export.export_time_series(self, file, format=format, layout=layout)
@@ -0,0 +1,147 @@
+import contextlib
+import json
+import os
+import threading
+import time
+
+# set to 1 to profile every Optigob in the process, or profile a block of code with profiling.profile()
+ENV_VAR = "OPTIGOB_PROFILE"
+
+_null_timer = contextlib.nullcontext()
+_profiler = None
+
+
+class Timer:
+    def __init__(self, profiler, key):
+        self.profiler = profiler
+        self.key = key
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *args):
+        self.profiler.add_time(self.key, self.start, time.perf_counter())
+
+
+class Profiler:
+    """
+    Timers and counters keyed by (stage, field, system), aggregated over all runs of the process.
+
+    The first max_trace_events timed spans are also kept as events for a Chrome trace
+    (chrome://tracing or https://ui.perfetto.dev).
+    """
+
+    def __init__(self, max_trace_events=100000):
+        self.max_trace_events = max_trace_events
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.timers = {}
+        self.counters = {}
+        self.events = []
+        self.origin = time.perf_counter()
+
+    def timer(self, stage, field="", system=""):
+        return Timer(self, (stage, field, system))
+
+    def add_time(self, key, start, end):
+        with self.lock:
+            (count, total, maximum) = self.timers.get(key, (0, 0.0, 0.0))
+            self.timers[key] = (count + 1, total + end - start, max(maximum, end - start))
+
+            if len(self.events) < self.max_trace_events:
+                self.events.append((key, start, end, threading.get_ident()))
+
+    def count(self, name, value=1, field="", system=""):
+        key = (name, field, system)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def get_summary(self):
+        import pandas as pd
+
+        rows = []
+        for (stage, field, system), (count, total, maximum) in self.timers.items():
+            rows.append({"stage": stage, "field": field, "system": system, "calls": count,
+                         "total_s": total, "mean_ms": 1000 * total / count, "max_ms": 1000 * maximum})
+        df = pd.DataFrame(rows, columns=["stage", "field", "system", "calls", "total_s", "mean_ms", "max_ms"])
+        return df.sort_values("total_s", ascending=False, ignore_index=True)
+
+    def get_counters(self):
+        import pandas as pd
+
+        rows = [{"counter": name, "field": field, "system": system, "value": value}
+                for (name, field, system), value in self.counters.items()]
+        df = pd.DataFrame(rows, columns=["counter", "field", "system", "value"])
+        return df.sort_values(["counter", "field", "system"], ignore_index=True)
+
+    def print_summary(self):
+        import pandas as pd
+
+        with pd.option_context("display.max_rows", None, "display.width", 200):
+            print(self.get_summary().to_string(index=False, float_format="%.4f"))
+            print()
+            print(self.get_counters().to_string(index=False))
+
+    def save_chrome_trace(self, file_path):
+        pid = os.getpid()
+        events = []
+        for ((stage, field, system), start, end, tid) in self.events:
+            events.append({"name": stage if system == "" else stage + " " + system,
+                           "cat": field if field != "" else "optigob",
+                           "ph": "X",
+                           "ts": (start - self.origin) * 1e6,
+                           "dur": (end - start) * 1e6,
+                           "pid": pid,
+                           "tid": tid,
+                           "args": {"field": field, "system": system}})
+        counters = {" ".join(k for k in key if k != ""): value for key, value in self.counters.items()}
+
+        with open(file_path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms", "otherData": counters}, f)
+
+
+def enable_profiling():
+    global _profiler
+    if _profiler is None:
+        _profiler = Profiler()
+    return _profiler
+
+
+def disable_profiling():
+    global _profiler
+    _profiler = None
+
+
+@contextlib.contextmanager
+def profile():
+    # profiles the with block into a fresh Profiler and restores the previous state afterwards;
+    # profiling is process-wide, so code other threads run meanwhile is profiled as well
+    global _profiler
+    previous = _profiler
+    _profiler = Profiler()
+    try:
+        yield _profiler
+    finally:
+        _profiler = previous
+
+
+def get_profiler():
+    return _profiler
+
+
+def timer(stage, field="", system=""):
+    # a shared no-op context manager while profiling is off, so instrumented code pays next to nothing
+    if _profiler is None:
+        return _null_timer
+    return _profiler.timer(stage, field, system)
+
+
+def count(name, value=1, field="", system=""):
+    if _profiler is not None:
+        _profiler.count(name, value, field, system)
+
+
+if os.environ.get(ENV_VAR, "0") not in ("", "0"):
+    enable_profiling()
@@ -1,7 +1,10 @@
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from configuration.keys import *
-from optigob.utils import add_two_lists, transform_to_co2e_time_series, get_total
+from optigob import profiling
+from optigob.time_series import TimeSeries, interpolate_schedule
+from optigob.metrics import DEFAULT_METRIC
+from optigob.utils import add_two_lists, transform_to_co2e_time_series, get_total, to_list
 
 
 @dataclass
@@ -19,15 +22,19 @@ class System(ABC):
         if key == CO2E:
             return self.get_co2e()
         if key in self.time_series.keys():
-            return [(self.name, self.time_series[key])]
+            return [(self.name, to_list(self.time_series[key]))]
 
         return []
 
-    def get_co2e(self):
-        co2e = transform_to_co2e_time_series(self.time_series[CO2], self.time_series[N2O], self.time_series[CH4])
+    def get_co2e(self, co2e_metric=DEFAULT_METRIC):
+        co2e = transform_to_co2e_time_series(self.time_series[CO2], self.time_series[N2O], self.time_series[CH4],
+                                             co2e_metric)
         return self.name, co2e
 
     def get_current_year(self, baseline_year):
+        if isinstance(self.time_series, TimeSeries):
+            return self.time_series.get_current_year()
+
         current_year = None
         for key, value in self.time_series.items():
             if current_year is None:
@@ -40,42 +47,63 @@ class System(ABC):
         return current_year
 
     def get_parameters_by_index(self, index):
+        if isinstance(self.time_series, TimeSeries):
+            return self.time_series.get_parameters_by_index(index)
+
         parameters = {}
         for key, value in self.time_series.items():
             parameters[key] = value[index]
         return parameters
 
     def update_time_series_entry(self, index, parameters: dict):
+        if isinstance(self.time_series, TimeSeries):
+            self.time_series.update_entry(index, parameters)
+            return
+
         for key, value in parameters.items():
             self.time_series[key][index] = value
 
     def update_time_series(self, new_config: dict, baseline_year, target_year):
-        if target_year <= self.get_current_year(baseline_year):
-            target_index = target_year - baseline_year
-            self.update_time_series_entry(target_index, new_config)
-        else:
-            baseline_dict = {}
-            for key, value in self.time_series.items():
-                if type(value) == list:
-                    baseline_dict[key] = value[-1]
-                else:
-                    baseline_dict[key] = value
-
-            timeframe = target_year - self.get_current_year(baseline_year)
-            for i in range(timeframe):
-                for key, value in new_config.items():
-                    if type(value) == str:
-                        self.time_series[key].append(value)
+        with profiling.timer("interpolation", system=self.name):
+            if isinstance(self.time_series, TimeSeries):
+                self.time_series.interpolate(new_config, target_year)
+                return
+
+            if target_year <= self.get_current_year(baseline_year):
+                target_index = target_year - baseline_year
+                self.update_time_series_entry(target_index, new_config)
+            else:
+                baseline_dict = {}
+                for key, value in self.time_series.items():
+                    if type(value) == list:
+                        baseline_dict[key] = value[-1]
                     else:
-                        new_value = (value - baseline_dict[key]) * ((i+1) / timeframe) + baseline_dict[key]
-                        self.time_series[key].append(new_value)
+                        baseline_dict[key] = value
+
+                timeframe = target_year - self.get_current_year(baseline_year)
+                for i in range(timeframe):
+                    for key, value in new_config.items():
+                        if type(value) == str:
+                            self.time_series[key].append(value)
+                        else:
+                            new_value = (value - baseline_dict[key]) * ((i+1) / timeframe) + baseline_dict[key]
+                            self.time_series[key].append(new_value)
+
+    # applies a whole waypoint schedule [(year, config), ...] and holds the last values up to target_year,
+    # same as update_time_series per waypoint followed by run
+    def run_schedule(self, schedule, baseline_year, target_year):
+        with profiling.timer("interpolation", system=self.name):
+            if isinstance(self.time_series, TimeSeries):
+                for (year, config) in schedule:
+                    self.time_series.interpolate(config, year)
+                if self.time_series.get_current_year() < target_year:
+                    self.time_series.interpolate(self.time_series.get_parameters_by_index(-1), target_year)
+                return
+
+            interpolate_schedule(self.time_series, schedule, baseline_year, target_year)
 
     def run(self, baseline_year, target_year, db_manager):
-        if self.get_current_year(baseline_year) < target_year:
-            parameters = self.get_parameters_by_index(-1)
-            self.update_time_series(new_config=parameters,
-                                    baseline_year=baseline_year,
-                                    target_year=target_year)
+        self.run_schedule([], baseline_year, target_year)
 
     def get_net_zero(self, time_span):
         co2 = self.time_series[CO2][:time_span]
@@ -109,7 +137,8 @@ class Field(ABC):
     # this method fills the time series for each system according to the database and the configuration
     def run(self, baseline_year, target_year, db_manager):
         for system in self.systems:
-            system.run(baseline_year, target_year, db_manager)
+            with profiling.timer("run", self.name, system.name):
+                system.run(baseline_year, target_year, db_manager)
 
     def get_system_names(self):
         system_names = []
@@ -129,10 +158,10 @@ class Field(ABC):
         return totals
 
     # evaluation methods for the user interface
-    def get_co2e(self, time_span):
+    def get_co2e(self, time_span, co2e_metric=DEFAULT_METRIC):
         output_list = []
         for s in self.systems:
-            output_list.append(s.get_co2e())
+            output_list.append(s.get_co2e(co2e_metric))
 
         total = get_total(output_list, time_span)
         output_list.append(("total_" + self.name, total))
@@ -2,7 +2,8 @@ from dataclasses import dataclass
 
 from optigob.systems.abstract_factory import Field, System
 from configuration.keys import *
-from optigob.utils import add_two_lists, transform_to_c02e, get_total
+from optigob.metrics import DEFAULT_METRIC
+from optigob.utils import add_two_lists, transform_to_co2e_time_series, get_total
 
 
 @dataclass
@@ -43,14 +44,12 @@ class AnaerobicDigestion(Field):
         data["time_series"] = {}
         self.systems.append(ADSystem(**data))
 
-    def get_co2e(self, time_span):
+    def get_co2e(self, time_span, co2e_metric=DEFAULT_METRIC):
         system = self.systems[0]
-        co2e = []
-        for i in range(time_span):
-            co2 = system.time_series[CO2][i] + system.time_series["additional_" + CO2][i]
-            ch4 = system.time_series[CH4][i] + system.time_series["additional_" + CH4][i]
-            n2o = system.time_series[N2O][i] + system.time_series["additional_" + N2O][i]
-            co2e.append(transform_to_c02e(co2=co2, ch4=ch4, n2o=n2o))
+        co2 = add_two_lists(system.time_series[CO2][:time_span], system.time_series["additional_" + CO2][:time_span])
+        ch4 = add_two_lists(system.time_series[CH4][:time_span], system.time_series["additional_" + CH4][:time_span])
+        n2o = add_two_lists(system.time_series[N2O][:time_span], system.time_series["additional_" + N2O][:time_span])
+        co2e = transform_to_co2e_time_series(co2=co2, n2o=n2o, ch4=ch4, co2e_metric=co2e_metric)
 
         output_list = [("ad_emissions", co2e)]
         return output_list
@@ -3,7 +3,7 @@ from dataclasses import dataclass
 from configuration.keys import *
 from optigob.systems.abstract_factory import Field, WayPointSystem
 from optigob.systems.agriculture import AgricultureSystem, AgricultureWayPoint
-from optigob.utils import get_total
+from optigob.utils import get_total, sort_waypoints
 
 
 @dataclass()
@@ -38,7 +38,7 @@ class CattleAgriculture(Field):
         self.name = CATTLE_AGRICULTURE
 
         way_points = []
-        for way_point in data[WAY_POINTS]:
+        for way_point in sort_waypoints(data[WAY_POINTS]):
             way_points.append(CattleWayPoint(**way_point))
 
         dairy = CattleSystem(name=CATTLE_AGRICULTURE_DAIRY,
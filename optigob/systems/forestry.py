@@ -2,6 +2,7 @@ from dataclasses import dataclass
 
 from optigob.systems.abstract_factory import Field, System
 from configuration.keys import *
+from optigob.metrics import DEFAULT_METRIC
 from optigob.utils import add_two_lists, get_total
 
 
@@ -17,8 +18,8 @@ class ForestrySystem(System):
     def init_nz_metrics(self, db_manager):
         self.nz_metrics = db_manager.get_nz_metrics(self.name, self.ccs)
 
-    def get_co2e(self):
-        # include net zero calculation table
+    def get_co2e(self, co2e_metric=DEFAULT_METRIC):
+        # include net zero calculation table, the series are CO2 only so they are the same under every metric
         co2e_emissions = []
         for metric in self.nz_metrics:
             co2e_emissions = add_two_lists(co2e_emissions, self.time_series[metric])
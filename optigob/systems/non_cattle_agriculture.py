@@ -3,7 +3,7 @@ from dataclasses import dataclass
 from optigob.systems.abstract_factory import Field
 from configuration.keys import *
 from optigob.systems.agriculture import AgricultureWayPoint, AgricultureSystem
-from optigob.utils import get_total
+from optigob.utils import get_total, sort_waypoints
 
 
 @dataclass
@@ -29,6 +29,8 @@ class NonCattleSystem(AgricultureSystem):
 
 
     def run(self, baseline_year, target_year, db_manager):
+        schedule = []
+        baseline = self.get_parameters_by_index(0)
         for waypoint in self.waypoints:
             assert isinstance(waypoint, NonCattleWayPoint)
             waypoint_data = waypoint.get_data(db_manager=db_manager, system_name=self.name, agriculture=TABLE_NON_CATTLE)
@@ -36,17 +38,18 @@ class NonCattleSystem(AgricultureSystem):
             if waypoint.scale_absolute_or_percentage:
                 scaler = waypoint.scaler / waypoint_data[waypoint.scale_parameter]
             else:
-                scaler = self.time_series[waypoint.scale_parameter][0] / waypoint_data[waypoint.scale_parameter] * waypoint.scaler
+                scaler = baseline[waypoint.scale_parameter] / waypoint_data[waypoint.scale_parameter] * waypoint.scaler
 
             for key, value in waypoint_data.items():
                 if isinstance(value, int) or isinstance(value, float):
                     waypoint_data[key] = scaler * value
 
-            self.update_time_series(new_config=waypoint_data,
-                                    baseline_year=baseline_year,
-                                    target_year=waypoint.year)
+            # a waypoint in the baseline year overwrites the baseline the following waypoints are scaled by
+            if waypoint.year == baseline_year:
+                baseline.update(waypoint_data)
+            schedule.append((waypoint.year, waypoint_data))
 
-        super().run(baseline_year, target_year, db_manager)
+        self.run_schedule(schedule, baseline_year, target_year)
 
 class NonCattleAgriculture(Field):
     def __init__(self, data):
@@ -55,7 +58,7 @@ class NonCattleAgriculture(Field):
 
         for system in data:
             way_points = []
-            for way_point in system[WAY_POINTS]:
+            for way_point in sort_waypoints(system[WAY_POINTS]):
                 way_points.append(NonCattleWayPoint(**way_point))
             self.systems.append(NonCattleSystem(name=system[NAME],
                                                 baseline_abatement=system[AGRICULTURE_BASELINE_ABATEMENT],
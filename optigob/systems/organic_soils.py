@@ -2,6 +2,8 @@ from dataclasses import dataclass
 
 from optigob.systems.abstract_factory import Field, WayPointSystem, WayPoint
 from configuration.keys import *
+from optigob.metrics import DEFAULT_METRIC
+from optigob.utils import sort_waypoints, transform_to_co2e_time_series
 
 @dataclass()
 class SoilType:
@@ -51,6 +53,10 @@ class OrganicSoilSystem(WayPointSystem):
         self.init_timeseries({})
 
     def update_soil(self, rewetting_ratio=0.1, baseline_year=2020, target_year=2050):
+        new_parameters = self.get_soil_parameters(rewetting_ratio)
+        self.update_time_series(new_config=new_parameters, baseline_year=baseline_year, target_year=target_year)
+
+    def get_soil_parameters(self, rewetting_ratio):
         baseline_drained_area = 0
         for st in self.soil_types:
             if st.drainage_status == DRAINED:
@@ -74,7 +80,7 @@ class OrganicSoilSystem(WayPointSystem):
                 else:
                     new_parameters[st.drainage_status + "_" + key] = value
 
-        self.update_time_series(new_config=new_parameters, baseline_year=baseline_year, target_year=target_year)
+        return new_parameters
 
     def area_balance(self, idx, area, drainage_status):
         st = self.get_soil_type(drainage_status)
@@ -102,13 +108,12 @@ class OrganicSoilSystem(WayPointSystem):
         return results
 
     def run(self, baseline_year, target_year, db_manager):
+        schedule = []
         for waypoint in self.waypoints:
             assert isinstance(waypoint, OrganicSoilWayPoint)
-            self.update_soil(rewetting_ratio=waypoint.rewetting_ratio,
-                             baseline_year=baseline_year,
-                             target_year=waypoint.year)
+            schedule.append((waypoint.year, self.get_soil_parameters(waypoint.rewetting_ratio)))
 
-        super().run(baseline_year, target_year, db_manager)
+        self.run_schedule(schedule, baseline_year, target_year)
 
 class OrganicSoils(Field):
     def __init__(self, data):
@@ -118,7 +123,7 @@ class OrganicSoils(Field):
         for s in data:
             way_points = []
             if WAY_POINTS in s:
-                for way_point in s[WAY_POINTS]:
+                for way_point in sort_waypoints(s[WAY_POINTS]):
                     way_points.append(OrganicSoilWayPoint(**way_point))
             self.systems.append(OrganicSoilSystem(name=s[NAME],
                                                   drainage_status=s[ORGANIC_SOILS_DRAINAGE_STATUS],
@@ -126,13 +131,21 @@ class OrganicSoils(Field):
                                                   time_series={},
                                                   soil_types=[]))
 
-    def get_co2e(self, time_span):
+    def get_co2e(self, time_span, co2e_metric=DEFAULT_METRIC):
         output_list = []
 
         for system in self.systems:
             assert isinstance(system, OrganicSoilSystem)
             for ds in system.drainage_status:
-                output_list.append((ds + "_" + system.name, system.time_series[ds + "_" + CO2E]))
+                if co2e_metric == DEFAULT_METRIC:
+                    co2e = system.time_series[ds + "_" + CO2E]
+                else:
+                    # the database co2e is on the default weights, other metrics weight the gases
+                    co2e = transform_to_co2e_time_series(system.time_series[ds + "_" + CO2],
+                                                         system.time_series[ds + "_" + N2O],
+                                                         system.time_series[ds + "_" + CH4],
+                                                         co2e_metric)
+                output_list.append((ds + "_" + system.name, co2e))
 
         return output_list
 
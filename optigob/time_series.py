@@ -0,0 +1,164 @@
+from collections.abc import MutableMapping
+
+import numpy as np
+
+
+class TimeSeries(MutableMapping):
+    # array-backed alternative to the dict of lists in System.time_series
+    # numeric keys are preallocated float64 arrays spanning baseline_year..target_year,
+    # string keys (units) are kept as a single value per key
+    # indexing a numeric key returns a view of the years filled so far, so in-place updates
+    # such as time_series[AREA][i] += diff behave exactly as with lists
+
+    def __init__(self, baseline_year, target_year):
+        self.baseline_year = baseline_year
+        self.target_year = target_year
+        self.length = target_year - baseline_year + 1
+        self.current = 0
+        self.keys_order = []
+        self.values = {}
+        self.units = {}
+
+    @classmethod
+    def from_dict(cls, time_series: dict, baseline_year, target_year):
+        ts = cls(baseline_year, target_year)
+        for key, value in time_series.items():
+            ts[key] = value
+        return ts
+
+    def get_current_year(self):
+        return self.baseline_year + self.current - 1
+
+    def __getitem__(self, key):
+        if key in self.values:
+            return self.values[key][:self.current]
+        if key in self.units:
+            return [self.units[key]] * self.current
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key not in self.values and key not in self.units:
+            self.keys_order.append(key)
+
+        if not isinstance(value, (list, np.ndarray)):
+            value = [value]
+        if len(value) > 0 and isinstance(value[-1], str):
+            self.units[key] = value[-1]
+            return
+
+        array = np.asarray(value[:self.length], dtype=np.float64)
+        values = np.empty(self.length, dtype=np.float64)
+        values[:len(array)] = array
+        # shorter series hold their last value, like a waypoint at the end of the series
+        values[len(array):] = array[-1] if len(array) > 0 else 0.0
+        self.values[key] = values
+        self.current = max(self.current, len(array))
+
+    def __delitem__(self, key):
+        self.keys_order.remove(key)
+        self.values.pop(key, None)
+        self.units.pop(key, None)
+
+    def __iter__(self):
+        return iter(self.keys_order)
+
+    def __len__(self):
+        return len(self.keys_order)
+
+    def get_parameters_by_index(self, index):
+        parameters = {}
+        for key in self.keys_order:
+            if key in self.units:
+                parameters[key] = self.units[key]
+            else:
+                parameters[key] = self.values[key][:self.current][index]
+        return parameters
+
+    def update_entry(self, index, parameters: dict):
+        for key, value in parameters.items():
+            if isinstance(value, str):
+                self.units[key] = value
+            else:
+                self.values[key][index] = value
+
+    def interpolate(self, new_config: dict, target_year):
+        # linear interpolation from the last filled year to target_year, one vector operation per key
+        # waypoints beyond target_year keep their slope, only the years within the horizon are stored
+        if target_year <= self.get_current_year():
+            self.update_entry(target_year - self.baseline_year, new_config)
+            return
+
+        start = self.current
+        timeframe = target_year - self.get_current_year()
+        n = min(timeframe, self.length - start)
+        steps = (np.arange(n) + 1) / timeframe
+        for key in self.keys_order:
+            if key in self.units:
+                if key in new_config:
+                    self.units[key] = new_config[key]
+                continue
+            values = self.values[key]
+            baseline = values[start - 1]
+            if key in new_config:
+                values[start:start + n] = (new_config[key] - baseline) * steps + baseline
+            else:
+                values[start:start + n] = baseline
+        self.current = start + n
+
+    def as_dict(self):
+        return {key: list(self[key]) if key in self.units else self[key].tolist() for key in self.keys_order}
+
+
+def interpolate_schedule(time_series: dict, schedule, baseline_year, target_year=None):
+    # fills a dict of lists for a whole waypoint schedule [(year, config), ...] in one pass, with the same
+    # result as calling System.update_time_series per waypoint and holding the last values up to target_year:
+    # - a waypoint at or before the last filled year overwrites that year's entries
+    # - otherwise each key in the waypoint config is interpolated linearly from its last value, all numeric
+    #   keys of a waypoint in one vector operation; string values (units) are repeated
+    lengths = {key: len(value) for key, value in time_series.items()}
+    current = max(lengths.values())
+
+    if target_year is not None:
+        schedule = list(schedule) + [(target_year, None)]
+
+    for (year, config) in schedule:
+        current_year = baseline_year + current - 1
+        if config is None:
+            # hold the last values up to the target year
+            if current_year >= year:
+                continue
+            config = {key: value[-1] for key, value in time_series.items()}
+
+        if year <= current_year:
+            index = year - baseline_year
+            for key, value in config.items():
+                time_series[key][index] = value
+            continue
+
+        timeframe = year - current_year
+        numeric_keys = []
+        for key, value in config.items():
+            if type(value) == str:
+                time_series[key].extend([value] * timeframe)
+                lengths[key] += timeframe
+            else:
+                numeric_keys.append(key)
+
+        if len(numeric_keys) > 0:
+            baselines = [time_series[key][-1] for key in numeric_keys]
+            targets = [config[key] for key in numeric_keys]
+            steps = (np.arange(timeframe) + 1) / timeframe
+            base = np.array(baselines, dtype=np.float64)[:, None]
+            segments = (np.array(targets, dtype=np.float64)[:, None] - base) * steps + base
+
+            for key, baseline, target, segment in zip(numeric_keys, baselines, targets, segments):
+                # plain floats unless numpy scalars were involved, as with per-year python arithmetic
+                if type(baseline) in (int, float) and type(target) in (int, float):
+                    time_series[key].extend(segment.tolist())
+                else:
+                    time_series[key].extend(segment)
+                lengths[key] += timeframe
+
+        current = max(lengths.values())
+
+    return time_series
@@ -1,24 +1,58 @@
+import numpy as np
+
+from optigob.metrics import DEFAULT_METRIC, apply_metric
+
+
+def is_array(*values):
+    # time series of an array-backed TimeSeries are numpy arrays, all others are plain lists
+    for v in values:
+        if isinstance(v, np.ndarray):
+            return True
+    return False
+
+def to_list(values):
+    if isinstance(values, np.ndarray):
+        return values.tolist()
+    return values
+
 def transform_to_c02e(co2, n2o, ch4):
     return co2 + 260 * n2o + 25 * ch4
 
-def transform_to_co2e_time_series(co2, n2o, ch4):
+def transform_to_co2e_time_series(co2, n2o, ch4, co2e_metric=DEFAULT_METRIC):
     assert len(co2) == len(n2o) and len(co2) == len(ch4)
+    if co2e_metric != DEFAULT_METRIC:
+        return apply_metric(co2, n2o, ch4, co2e_metric)
+    if is_array(co2, n2o, ch4):
+        return transform_to_c02e(np.asarray(co2), np.asarray(n2o), np.asarray(ch4))
+
     co2e = []
     for i in range(len(co2)):
         co2e.append(transform_to_c02e(co2[i], n2o[i], ch4[i]))
     return co2e
 
+def sort_waypoints(waypoints):
+    # waypoints are applied in year order, the sort is stable for waypoints of the same year
+    return sorted(waypoints, key=lambda way_point: way_point["year"])
+
 def add_two_lists(list1, list2):
     if len(list1) == 0:
         return list2
     if len(list2) == 0:
         return list1
     if len(list1) == len(list2):
+        if is_array(list1, list2):
+            return np.add(list1, list2)
         return [x + y for x, y in zip(list1, list2)]
 
     return None
 
 def get_total(system_list, time_span):
+    if is_array(*[l for (_, l) in system_list]):
+        sum_list = np.zeros(time_span)
+        for (n, l) in system_list:
+            sum_list += np.asarray(l[:time_span], dtype=np.float64)
+        return sum_list
+
     sum_list = []
     for _ in range(time_span):
         sum_list.append(0)
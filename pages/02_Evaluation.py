@@ -2,7 +2,10 @@ import pandas as pd
 import streamlit as st
 import json
 
+from optigob.batch import PARAMETERS
+from optigob.config_hash import get_config_hash
 from optigob.optigob import Optigob
+from resource_manager.data_cache import get_data_cache
 
 st.set_page_config(
     page_title="Configuration Evaluation",
@@ -11,6 +14,26 @@ st.set_page_config(
 
 st.title("Configuration Review & Evaluation")
 
+DB_FILE = "data/database.db"
+# scenarios kept per server process, shared by all sessions and evicted least recently used; keyed on the config
+# and the database version, so models built before pages/05_Data_Management.py rebuilt the database are not served
+MODEL_CACHE_ENTRIES = 32
+
+
+@st.cache_resource(max_entries=MODEL_CACHE_ENTRIES, show_spinner="Running scenario...")
+def load_optigob(config_hash: str, db_version, _config: dict) -> Optigob:
+    # evaluated up front, sessions only read from the shared model
+    optigob = Optigob(json_config=_config, db_file_path=DB_FILE)
+    optigob.run()
+    for parameter in PARAMETERS:
+        optigob.get_evaluation(parameter)
+    return optigob
+
+
+@st.cache_data(max_entries=MODEL_CACHE_ENTRIES, show_spinner="Preparing time series download...")
+def export_optigob(config_hash: str, db_version, _optigob: Optigob) -> bytes:
+    return _optigob.export_time_series().getvalue()
+
 # -------------------------
 # Load configuration
 # -------------------------
@@ -22,9 +45,10 @@ if config is None:
     if st.button("Back to configuration builder"):
         st.switch_page("app.py")
     st.stop()
-else:
-    optigob = Optigob(json_config=config, db_file_path="data/database.db")
-    optigob.run()
+
+config_hash = get_config_hash(config)
+db_version = get_data_cache(DB_FILE).version
+optigob = load_optigob(config_hash, db_version, config)
 
 # -------------------------
 # Display configuration
@@ -44,7 +68,7 @@ with st.expander("Generated Configuration", expanded=False):
 
 st.download_button(
     label="Download time series",
-    data=optigob.export_time_series(),
+    data=export_optigob(config_hash, db_version, optigob),
     file_name="exported_time_series.xlsx",
     mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
 )
@@ -1,13 +1,13 @@
-import glob
 import os
+import shutil
 import threading
 import time
 
 import streamlit as st
 
 from moo.optigob_problem import DEFAULT_LOWER_BOUND, DEFAULT_UPPER_BOUND
+from moo.results_store import RESULTS_FILE
 
-RESULTS_DIR = "moo/results"
 
 DEFAULTS = {
     "sd_population_size": 100,
@@ -16,6 +16,7 @@ DEFAULTS = {
     "sd_mutation_distribution_index": 20,
     "sd_crossover_probability": 0.9,
     "sd_crossover_distribution_index": 20,
+    "sd_evaluator_workers": 1,
 }
 
 # ---------------------------------------------------------------------------
@@ -340,6 +341,16 @@ with col2:
         help="Controls the spread of the SBX crossover. Higher values produce offspring closer to the parents.",
     )
 
+evaluator_workers = st.number_input(
+    "Worker processes",
+    min_value=1,
+    max_value=os.cpu_count() or 1,
+    value=DEFAULTS["sd_evaluator_workers"],
+    step=1,
+    key="sd_evaluator_workers",
+    help="Number of processes evaluating the population in parallel. Results do not depend on this setting.",
+)
+
 # ---------------------------------------------------------------------------
 # Variable bounds
 # ---------------------------------------------------------------------------
@@ -411,6 +422,7 @@ st.session_state["moo_params"] = {
     "mutation_distribution_index": int(mutation_distribution_index),
     "crossover_probability": float(crossover_probability),
     "crossover_distribution_index": int(crossover_distribution_index),
+    "evaluator_workers": int(evaluator_workers),
     "lower_bound": list(lo_bounds),
     "upper_bound": list(hi_bounds),
 }
@@ -435,9 +447,10 @@ with btn_col1:
 
 with btn_col2:
     if st.button("Run Optimisation ➜"):
-        # Clear existing CSV results
-        for f in glob.glob(os.path.join(RESULTS_DIR, "*.csv")):
-            os.remove(f)
+        # Clear existing results
+        results_dir = os.path.dirname(RESULTS_FILE)
+        if os.path.exists(results_dir):
+            shutil.rmtree(results_dir)
 
         params = st.session_state["moo_params"]
         progress = {
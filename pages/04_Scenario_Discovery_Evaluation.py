@@ -1,15 +1,13 @@
-import ast
-import glob
 import json
-import os
-import re
+from contextlib import closing
+
 import altair as alt
-import numpy as np
 import pandas as pd
 import streamlit as st
 
-RESULTS_DIR = "moo/results"
-OBJECTIVES = ["co2e", "hnv", "protein", "hwp"]
+from moo.hypervolume import HypervolumeHistory
+from moo.results_store import OBJECTIVES, RESULTS_FILE, open_results, get_run_id, get_generations, load_objectives, load_generation, get_config
+
 LABELS = {
     "co2e": "Net Zero CO2e",
     "hnv": "Biodiversity (HNV)",
@@ -27,85 +25,63 @@ st.title("Scenario Discovery Evaluation")
 # Guard: results must exist
 # -------------------------
 
-csv_files = sorted(glob.glob(os.path.join(RESULTS_DIR, "*_pareto.csv")))
-if not csv_files:
+# a connection is opened per read and closed straight after, nothing is held across reruns
+has_results = False
+conn = open_results(RESULTS_FILE)
+if conn is not None:
+    with closing(conn):
+        has_results = bool(get_generations(conn))
+        run_id = get_run_id(conn)
+if not has_results:
     st.warning("No optimisation results found. Please run the Scenario Discovery first.")
     if st.button("← Back to Scenario Discovery"):
         st.switch_page("pages/03_Scenario_Discovery.py")
     st.stop()
 
 # -------------------------
-# Data loading (cached per run via file count as key)
+# Data loading (incremental, only generations added since the last rerun are read)
 # -------------------------
 
-n_files = len(csv_files)
 
+def load_all_generations(results_path: str, run_id: str) -> dict[int, pd.DataFrame]:
+    cached = st.session_state.get("sd_results")
+    if cached is None or cached["run_id"] != run_id:
+        cached = {"run_id": run_id, "generations": {}}
 
-@st.cache_data
-def load_all_generations(n_files: int) -> dict[int, pd.DataFrame]:
-    pattern = re.compile(r"gen(\d+)_pareto\.csv$")
-    gens: dict[int, pd.DataFrame] = {}
-    for fpath in glob.glob(os.path.join(RESULTS_DIR, "*_pareto.csv")):
-        m = pattern.search(fpath)
-        if m:
-            gens[int(m.group(1))] = pd.read_csv(fpath, usecols=OBJECTIVES)
-    return dict(sorted(gens.items()))
+    last_gen = max(cached["generations"], default=-1)
+    with closing(open_results(results_path)) as conn:
+        cached["generations"].update(load_objectives(conn, after_generation=last_gen))
+    st.session_state["sd_results"] = cached
+    return cached["generations"]
 
 
 @st.cache_data
-def load_generation_with_json(gen: int, n_files: int) -> pd.DataFrame:
-    return pd.read_csv(os.path.join(RESULTS_DIR, f"gen{gen}_pareto.csv"))
+def load_generation_with_variables(results_path: str, run_id: str, gen: int) -> pd.DataFrame:
+    with closing(open_results(results_path)) as conn:
+        return load_generation(conn, gen)
 
 
-@st.cache_data
-def compute_all_hypervolumes(n_files: int, n_samples: int = 10_000) -> tuple[list, list]:
+def compute_all_hypervolumes(generations: dict[int, pd.DataFrame]) -> tuple[list, list]:
     """
-    Monte Carlo hypervolume approximation (vectorised, fast for large fronts).
-    Objectives are normalised to [0, 1] using the global min/max across all generations;
+    Exact hypervolume per generation, generations computed on an earlier rerun are reused.
+    Objectives are normalised to [0, 1] using the min/max of the first generation;
     reference point is 1.1 in every normalised dimension.
     """
-    gens = load_all_generations(n_files)
-    if not gens:
-        return [], []
-
-    all_data = pd.concat(gens.values())
-    g_min = all_data[OBJECTIVES].min().values
-    g_range = (all_data[OBJECTIVES].max() - all_data[OBJECTIVES].min()).values
-    g_range[g_range == 0] = 1.0  # avoid divide-by-zero
-
-    ref = np.array([1.1] * len(OBJECTIVES))
-    box_volume = float(np.prod(ref))
-
-    rng = np.random.default_rng(42)
-    samples = rng.uniform(0.0, ref, size=(n_samples, len(OBJECTIVES)))
-
-    gen_numbers, hvs = [], []
-    for gen, df in gens.items():
-        pts = ((df[OBJECTIVES].values - g_min) / g_range).clip(0, None)
-        valid = pts[np.all(pts <= ref, axis=1)]
-        if len(valid) == 0:
-            hvs.append(0.0)
-        else:
-            # dominated[i] = True if sample i is dominated by any Pareto point
-            # shape broadcast: (n_samples,1,d) >= (1,m,d) → (n_samples,m,d)
-            batch = 500
-            dominated = np.zeros(n_samples, dtype=bool)
-            for start in range(0, n_samples, batch):
-                sl = samples[start : start + batch]
-                dominated[start : start + batch] = np.any(
-                    np.all(sl[:, None, :] >= valid[None, :, :], axis=2), axis=1
-                )
-            hvs.append(box_volume * dominated.mean())
-        gen_numbers.append(gen)
+    history = st.session_state.get("sd_hypervolumes")
+    if history is None or history[0] != run_id:
+        history = (run_id, HypervolumeHistory(margin=0.1))
+        st.session_state["sd_hypervolumes"] = history
 
-    return gen_numbers, hvs
+    hvs = history[1].update({gen: df[OBJECTIVES].values for gen, df in generations.items()})
+    gen_numbers = sorted(generations.keys())
+    return gen_numbers, [hvs[gen] for gen in gen_numbers]
 
 
 # -------------------------
 # Load data
 # -------------------------
 
-generations = load_all_generations(n_files)
+generations = load_all_generations(RESULTS_FILE, run_id)
 gen_numbers = sorted(generations.keys())
 final_gen = max(gen_numbers)
 
@@ -243,7 +219,7 @@ with tab1:
         pt1 = _first_point(s1)
         if pt1.get("_idx") is not None:
             idx = int(pt1["_idx"])
-            full_df = load_generation_with_json(final_gen, n_files)
+            full_df = load_generation_with_variables(RESULTS_FILE, run_id, final_gen)
             selected_row = full_df.iloc[idx]
             selected_gen_num = final_gen
 
@@ -253,7 +229,7 @@ with tab1:
             if pt2.get("Generation") is not None and pt2.get("_gen_idx") is not None:
                 sel_gen = int(pt2["Generation"])
                 sel_idx = int(pt2["_gen_idx"])
-                full_df = load_generation_with_json(sel_gen, n_files)
+                full_df = load_generation_with_variables(RESULTS_FILE, run_id, sel_gen)
                 selected_row = full_df.iloc[sel_idx]
                 selected_gen_num = sel_gen
 
@@ -268,10 +244,7 @@ with tab1:
             m3.metric(LABELS["protein"], f"{selected_row['protein']:.3e}")
             m4.metric(LABELS["hwp"], f"{selected_row['hwp']:.3e}")
 
-            try:
-                config_dict = ast.literal_eval(selected_row["json"])
-            except Exception:
-                config_dict = selected_row["json"]
+            config_dict = get_config(selected_row["variables"])
 
             with st.expander("Full JSON Configuration", expanded=True):
                 st.json(config_dict)
@@ -300,7 +273,7 @@ with tab2:
         key="cf_gen_slider",
     )
 
-    df_full = load_generation_with_json(cf_gen, n_files)
+    df_full = load_generation_with_variables(RESULTS_FILE, run_id, cf_gen)
 
     # --- Objective filter sliders ---
     st.divider()
@@ -370,10 +343,7 @@ with tab2:
             m3.metric(LABELS["protein"], f"{row['protein']:.3e}")
             m4.metric(LABELS["hwp"], f"{row['hwp']:.3e}")
 
-            try:
-                config_dict = ast.literal_eval(row["json"])
-            except Exception:
-                config_dict = row["json"]
+            config_dict = get_config(row["variables"])
 
             with st.expander("Full JSON Configuration", expanded=True):
                 st.json(config_dict)
@@ -395,13 +365,13 @@ with tab2:
 with tab3:
     st.subheader("Hypervolume Indicator")
     st.caption(
-        "Objectives are normalised to [0, 1] across all generations before computing. "
-        "Hypervolume is approximated via Monte Carlo sampling (10,000 samples, reference point 1.1 per dimension). "
+        "Objectives are normalised to [0, 1] using the range of the first generation before computing. "
+        "Hypervolume is computed exactly (reference point 1.1 per dimension), new generations are added incrementally. "
         "A rising curve indicates the front is still expanding into better trade-off regions."
     )
 
     with st.spinner("Computing hypervolume across all generations…"):
-        hv_gens, hv_vals = compute_all_hypervolumes(n_files)
+        hv_gens, hv_vals = compute_all_hypervolumes(generations)
 
     if hv_gens:
         col_a, col_b, col_c = st.columns(3)
@@ -97,6 +97,8 @@ if st.button(
     type="primary",
 ):
     from resource_manager.create_database import read_forestry, read_animals
+    from resource_manager.data_cache import clear_data_cache
+    from resource_manager.snapshot import compile_snapshot, get_snapshot_path
 
     errors = []
     with st.spinner("Rebuilding database…"):
@@ -104,8 +106,11 @@ if st.button(
             try:
                 with open(STATIC_FILE, "wb") as f:
                     f.write(static_upload.read())
-                read_forestry(STATIC_FILE, DB_FILE)
-                st.success("static_systems.xlsx imported successfully.")
+                rebuilt = read_forestry(STATIC_FILE, DB_FILE)
+                if rebuilt:
+                    st.success(f"static_systems.xlsx imported successfully, rebuilt: {', '.join(rebuilt)}.")
+                else:
+                    st.success("static_systems.xlsx is unchanged, nothing to rebuild.")
             except Exception as exc:
                 errors.append(f"static_systems.xlsx: {exc}")
 
@@ -113,10 +118,20 @@ if st.button(
             try:
                 with open(DYNAMIC_FILE, "wb") as f:
                     f.write(dynamic_upload.read())
-                read_animals(DYNAMIC_FILE, DB_FILE)
-                st.success("dynamic_systems.xlsx imported successfully.")
+                rebuilt = read_animals(DYNAMIC_FILE, DB_FILE)
+                if rebuilt:
+                    st.success(f"dynamic_systems.xlsx imported successfully, rebuilt: {', '.join(rebuilt)}.")
+                else:
+                    st.success("dynamic_systems.xlsx is unchanged, nothing to rebuild.")
             except Exception as exc:
                 errors.append(f"dynamic_systems.xlsx: {exc}")
 
+        # keep a compiled snapshot in step with the rebuilt database
+        if os.path.exists(get_snapshot_path(DB_FILE)):
+            compile_snapshot(DB_FILE)
+
+        # drop cached tables even if the rebuild left the file's mtime unchanged
+        clear_data_cache(DB_FILE)
+
     for err in errors:
         st.error(f"Import failed — {err}")
@@ -0,0 +1,127 @@
+import contextlib
+import os
+import queue
+import sqlite3
+import threading
+from functools import lru_cache
+from urllib.parse import quote
+
+from optigob import profiling
+
+# process-wide pools of read-only connections to the scenario database, shared by Streamlit sessions
+# and evaluation workers; a pool is replaced as soon as the file's modification time or size changes
+_pools = {}
+_lock = threading.Lock()
+
+
+def get_database_version(database_path):
+    stat = os.stat(database_path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def get_connection_pool(database_path, immutable=False):
+    # immutable skips sqlite's file locking and change detection altogether, only use it for files that are
+    # never rewritten while the process runs (the Data Management page rebuilds data/database.db in place)
+    database_path = os.path.abspath(database_path)
+    version = get_database_version(database_path)
+
+    with _lock:
+        pool = _pools.get((database_path, immutable))
+        if pool is None or pool.version != version:
+            if pool is not None:
+                pool.close()
+            pool = ConnectionPool(database_path, version, immutable)
+            _pools[(database_path, immutable)] = pool
+        return pool
+
+
+def clear_connection_pools(database_path=None):
+    with _lock:
+        for key in list(_pools.keys()):
+            if database_path is None or key[0] == os.path.abspath(database_path):
+                _pools.pop(key).close()
+
+
+@lru_cache(maxsize=256)
+def build_select(table, columns, where, order_by):
+    # one sql string per query shape, so sqlite's per-connection statement cache reuses the prepared statement
+    query = "SELECT " + ("*" if columns is None else ", ".join(f'"{c}"' for c in columns))
+    query += f' FROM "{table}"'
+    if where:
+        query += " WHERE " + " AND ".join(f'"{c}" = ?' for c in where)
+    if order_by is not None:
+        query += f' ORDER BY "{order_by}"'
+    return query
+
+
+class ConnectionPool:
+    def __init__(self, database_path, version=None, immutable=False, max_size=8):
+        self.database_path = database_path
+        self.version = version
+        self.uri = "file:" + quote(database_path) + "?mode=ro" + ("&immutable=1" if immutable else "")
+        self.max_size = max_size
+        self.idle = queue.LifoQueue()
+        self.schema = {}
+        self.lock = threading.Lock()
+
+    def connect(self):
+        return sqlite3.connect(self.uri, uri=True, check_same_thread=False, cached_statements=256)
+
+    @contextlib.contextmanager
+    def connection(self):
+        try:
+            conn = self.idle.get_nowait()
+        except queue.Empty:
+            conn = self.connect()
+        try:
+            yield conn
+        finally:
+            if self.idle.qsize() < self.max_size:
+                self.idle.put(conn)
+            else:
+                conn.close()
+
+    def close(self):
+        while True:
+            try:
+                self.idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+    def query(self, sql, params=()):
+        # plain columns {name: [values]}, without building a DataFrame
+        with self.connection() as conn:
+            cursor = conn.execute(sql, params)
+            columns = [d[0] for d in cursor.description]
+            rows = cursor.fetchall()
+
+        if len(rows) == 0:
+            return {c: [] for c in columns}
+        return {c: list(values) for c, values in zip(columns, zip(*rows))}
+
+    def get_columns(self, table):
+        with self.lock:
+            if table not in self.schema:
+                with self.connection() as conn:
+                    self.schema[table] = [row[1] for row in conn.execute(f'PRAGMA table_info("{table}")')]
+            return self.schema[table]
+
+    def check_columns(self, table, columns):
+        # sqlite column names are case-insensitive, e.g. BECCS vs beccs
+        known = {c.lower() for c in self.get_columns(table)}
+        for column in columns:
+            if column.lower() not in known:
+                raise ValueError(f"no such column: {table}.{column}")
+
+    def select(self, table, columns=None, where=None, order_by=None):
+        # table names must be whitelisted by the caller, column names are checked against the schema
+        where = where or {}
+        self.check_columns(table, list(columns or []) + list(where.keys()) + ([order_by] if order_by else []))
+
+        sql = build_select(table, None if columns is None else tuple(columns), tuple(where.keys()), order_by)
+        with profiling.timer("db_query", table):
+            data = self.query(sql, tuple(where.values()))
+
+        profiling.count("db_queries", field=table)
+        profiling.count("db_rows", len(next(iter(data.values()), [])), field=table)
+        return data
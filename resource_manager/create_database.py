@@ -1,10 +1,30 @@
+import hashlib
 import itertools
 import sqlite3
+from datetime import datetime
 from itertools import combinations
 
+import numpy as np
 import pandas as pd
 from pandas.core.interchange.dataframe_protocol import DataFrame
 
+# bump when the layout of the generated tables changes
+SCHEMA_VERSION = 1
+
+# composite indexes matching the queries of DatabaseManager: filter columns first, then the order column
+INDEXES = {
+    "existing_forest": [("harvest_rate", "ccs", "year")],
+    "afforestation": [("harvest_rate", "ccs", "bl_c_ratio", "o_m_ratio", "year")],
+    "nz_calc_included": [("system", "ccs"), ("system", "no_ccs")],
+    "ad_biomethane_strategy": [("ccs", "year")],
+    "additional_ad": [("ccs", "year")],
+    "willow_beccs": [("ccs", "year")],
+    "cattle": [("Abatement", "Productivity", "System")],
+    "non_cattle": [("Abatement", "Productivity", "System")],
+    "organic_soils": [("Organic soil type", "Drainage status")],
+}
+INTEGER_COLUMNS = ["year", "Year", "Scenario"]
+
 
 def create_table(data):
     indices = {}
@@ -56,15 +76,9 @@ def create_scenario_table(param_dict):
     combinations = list(itertools.product(*values))
     return pd.DataFrame(combinations, columns=keys)
 
-def match_scenario(scenario, data, indices, data_idx):
-    for key, value in scenario.items():
-        entry = data[indices[key]][data_idx]
-        if (not (entry == "" or entry == "any")) and not entry == value:
-            return False
-    return True
-
 def create_forestry_table(data):
-
+    # header rows (metric, unit, scenario parameters) down to the year row, one data column per metric and
+    # combination of parameter values, where "any" or an empty cell matches every value of that parameter
     indices = {}
     for i in range(10):
         indices.update({data[i][0].lower() : i})
@@ -77,103 +91,164 @@ def create_forestry_table(data):
         if not h in ["year", "metric", "unit"]:
             parameter_name_list.append(h)
 
+    header = np.array([row[1:] for row in data[:indices["year"]]], dtype=object)
+    values = np.array([row[1:] for row in data[indices["year"] + 1:]], dtype=object)
+    years = [int(row[0]) for row in data[indices["year"] + 1:]]
+
     param_dict = {}
     for p in parameter_name_list:
-        values = []
-        for v in data[indices[p]]:
-            if v != p and v != "any" and v != "" and not v in values:
-                values.append(v)
-        param_dict[p] = values
-
+        param_dict[p] = [v for v in pd.unique(header[indices[p]]) if v != p and v != "any" and v != ""]
     scenarios = create_scenario_table(param_dict)
 
-    table_data = {"year": []}
+    # matches[s, j]: data column j applies to scenario s
+    matches = np.ones((len(scenarios), header.shape[1]), dtype=bool)
     for p in parameter_name_list:
-        table_data[p] = []
-    for m in range(1, len(data[0])):
-        table_data[data[0][m]] = []
-        table_data[data[0][m] + "_unit"] = []
-
-    for row in scenarios.itertuples(index=False):
-        params = row._asdict()
-        for i in range(indices["year"] + 1, len(data)):
-            table_data["year"].append(int(data[i][0]))
-            for key, value in params.items():
-                table_data[key].append(value)
-        for j in range(1, len(data[0])):
-            if match_scenario(params, data, indices, j):
-                for i in range(indices["year"] + 1, len(data)):
-                    table_data[data[indices["metric"]][j]].append(data[i][j])
-                    table_data[data[indices["metric"]][j] + "_unit"].append(data[indices["unit"]][j])
-
-    df = pd.DataFrame(data=table_data)
-    return df
+        entries = header[indices[p]]
+        wildcard = (entries == "") | (entries == "any")
+        matches &= wildcard[None, :] | (entries[None, :] == scenarios[p].to_numpy(dtype=object)[:, None])
 
+    metrics = header[indices["metric"]]
+    units = header[indices["unit"]]
 
-def read_forestry(excel_path, sqlite_db_path):
-    conn = sqlite3.connect(sqlite_db_path)
-
-    xls_sheets = pd.ExcelFile(excel_path).sheet_names
-    for sheet in xls_sheets:
-        if sheet == "nz_calc_included":
-            data = pd.read_excel(excel_path, sheet_name=sheet)
-            df = pd.DataFrame(data=data)
-            df.to_sql(sheet, conn, if_exists='replace', index=False)
-        else:
-            data = pd.read_excel(excel_path, sheet_name=sheet, header=None).values.tolist()
-            df = create_forestry_table(data)
-            df.to_sql(sheet, conn, if_exists='replace', index=False)
-
-    conn.commit()
-    conn.close()
+    table_data = {"year": years * len(scenarios)}
+    for p in parameter_name_list:
+        table_data[p] = np.repeat(scenarios[p].to_numpy(dtype=object), len(years))
+    for metric in dict.fromkeys(metrics):
+        metric_matches = matches & (metrics == metric)[None, :]
+        counts = metric_matches.sum(axis=1)
+        if np.any(counts != 1):
+            s = int(np.argmax(counts != 1))
+            raise ValueError(f"{counts[s]} columns of metric {metric} match the scenario {scenarios.iloc[s].to_dict()}")
+        columns = np.argmax(metric_matches, axis=1)
+        table_data[metric] = values[:, columns].T.reshape(-1)
+        table_data[metric + "_unit"] = np.repeat(units[columns], len(years))
+
+    df = pd.DataFrame(data=table_data).infer_objects()
+    return df
 
 def create_animals_table(data):
+    # scenario parameter rows, an empty row with the unit header, then one row per metric (name, unit, values)
+    # with one column per scenario: melted into one row per scenario and metric, scenario by scenario
     parameter_name_list = []
     i = 0
     while type(data[i][0]) is str:
         parameter_name_list.append(data[i][0])
         i += 1
-    parameter_name_list.append("metric")
-    parameter_name_list.append("unit")
-    parameter_name_list.append("value")
-
     pivot_i = i
     pivot_j = 1
 
-    parameter_list = []
-    for _ in parameter_name_list:
-        parameter_list.append([])
-
-    for j in range(pivot_j + 1, len(data[0])):
-        for i in range(pivot_i + 1, len(data)):
-            parameter_list[parameter_name_list.index("value")].append(data[i][j])
-            parameter_list[parameter_name_list.index("metric")].append(data[i][0])
-            parameter_list[parameter_name_list.index("unit")].append(data[i][1])
-            for k in range(pivot_i):
-                parameter_list[parameter_name_list.index(data[k][0])].append(data[k][j])
+    header = np.array([row[pivot_j + 1:] for row in data[:pivot_i]], dtype=object)
+    values = np.array([row[pivot_j + 1:] for row in data[pivot_i + 1:]], dtype=object)
+    n_metrics, n_scenarios = values.shape
 
     d = {}
-    for i in range(len(parameter_name_list)):
-        d.update({parameter_name_list[i] : parameter_list[i]})
-    df = pd.DataFrame(data=d)
+    for k, name in enumerate(parameter_name_list):
+        d[name] = np.repeat(header[k], n_metrics)
+    d["metric"] = [row[0] for row in data[pivot_i + 1:]] * n_scenarios
+    d["unit"] = [row[1] for row in data[pivot_i + 1:]] * n_scenarios
+    d["value"] = values.T.reshape(-1)
+    df = pd.DataFrame(data=d).infer_objects()
     return df
 
-def read_animals(excel_path, sqlite_db_path):
-    conn = sqlite3.connect(sqlite_db_path)
-
-    xls_sheets = pd.ExcelFile(excel_path).sheet_names
-    for sheet in xls_sheets:
-        if sheet == "scalers":
-            data = pd.read_excel(excel_path, sheet_name=sheet)
-            df = pd.DataFrame(data=data)
-            df.to_sql(sheet, conn, if_exists='replace', index=False)
+
+def get_column_types(df):
+    # sheets mix numbers and numeric strings (e.g. o_m_ratio holds '0' and 0.15), so a column is numeric
+    # when all of its values convert, instead of relying on the dtype pandas inferred
+    types = {}
+    for column in df.columns:
+        numeric = pd.to_numeric(df[column], errors="coerce")
+        if (numeric.isna() & df[column].notna()).any():
+            types[column] = "TEXT"
+        elif column in INTEGER_COLUMNS:
+            types[column] = "INTEGER"
         else:
-            data = pd.read_excel(excel_path, sheet_name=sheet, header=None).values.tolist()
-            df = create_animals_table(data)
-            df.to_sql(sheet, conn, if_exists='replace', index=False)
+            types[column] = "REAL"
+    return types
+
+def write_table(df, table, conn):
+    types = get_column_types(df)
+    columns = []
+    for column, sql_type in types.items():
+        values = df[column]
+        if sql_type == "INTEGER":
+            values = pd.to_numeric(values).astype("int64")
+        elif sql_type == "REAL":
+            values = pd.to_numeric(values).astype(float)
+        columns.append([None if pd.isna(v) else v for v in values.tolist()])
+
+    # written directly instead of with DataFrame.to_sql, which commits on its own
+    definition = ", ".join(f'"{column}" {sql_type}' for column, sql_type in types.items())
+    conn.execute(f'DROP TABLE IF EXISTS "{table}"')
+    conn.execute(f'CREATE TABLE "{table}" ({definition})')
+    conn.executemany(f'INSERT INTO "{table}" VALUES ({", ".join("?" * len(types))})', zip(*columns))
+
+    for i, columns in enumerate(INDEXES.get(table, [])):
+        columns = ", ".join('"' + c + '"' for c in columns)
+        conn.execute(f'CREATE INDEX "idx_{table}_{i}" ON "{table}" ({columns})')
+
+def get_sheet_hash(sheet):
+    # the hash covers the schema version too, so a new layout rebuilds every table
+    content = repr((SCHEMA_VERSION, sheet.columns.tolist(), sheet.values.tolist()))
+    return hashlib.sha256(content.encode()).hexdigest()
+
+def get_sheet_hashes(conn):
+    conn.execute("CREATE TABLE IF NOT EXISTS sheet_hashes (sheet TEXT PRIMARY KEY, hash TEXT)")
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    # a recorded hash only counts while its table still exists
+    return {sheet: h for (sheet, h) in conn.execute("SELECT sheet, hash FROM sheet_hashes") if sheet in tables}
+
+def finalise_database(conn):
+    conn.execute("CREATE TABLE IF NOT EXISTS schema_version (version INTEGER, created TEXT)")
+    conn.execute("DELETE FROM schema_version")
+    conn.execute("INSERT INTO schema_version VALUES (?, ?)", (SCHEMA_VERSION, datetime.now().isoformat(timespec="seconds")))
+    # statistics for the query planner
+    conn.execute("ANALYZE")
+
+def import_workbook(excel_path, sqlite_db_path, create_sheet_table, header_sheets):
+    # reads every sheet of the workbook once and rebuilds, in a single transaction, only the tables whose
+    # sheet content changed since the last import; returns the names of the rebuilt tables
+    with pd.ExcelFile(excel_path) as xls:
+        sheets = {sheet: xls.parse(sheet, header=0 if sheet in header_sheets else None) for sheet in xls.sheet_names}
+
+    conn = sqlite3.connect(sqlite_db_path, isolation_level=None)
+    try:
+        conn.execute("BEGIN")
+        hashes = get_sheet_hashes(conn)
+
+        rebuilt = []
+        for sheet, data in sheets.items():
+            sheet_hash = get_sheet_hash(data)
+            if hashes.get(sheet) == sheet_hash:
+                continue
+
+            if sheet in header_sheets:
+                df = pd.DataFrame(data=data)
+            else:
+                df = create_sheet_table(data.values.tolist())
+            write_table(df, sheet, conn)
+            conn.execute("INSERT OR REPLACE INTO sheet_hashes VALUES (?, ?)", (sheet, sheet_hash))
+            rebuilt.append(sheet)
+
+        if rebuilt:
+            finalise_database(conn)
+            conn.execute("COMMIT")
+        else:
+            # leave the file untouched, so cached tables stay valid
+            conn.execute("ROLLBACK")
+    except BaseException:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+
+    return rebuilt
 
-    conn.commit()
-    conn.close()
+def read_forestry(excel_path, sqlite_db_path):
+    return import_workbook(excel_path, sqlite_db_path, create_forestry_table, header_sheets=["nz_calc_included"])
+
+def read_animals(excel_path, sqlite_db_path):
+    return import_workbook(excel_path, sqlite_db_path, create_animals_table, header_sheets=["scalers"])
 
 if __name__ == "__main__":
     read_forestry("../data/static_systems.xlsx", "../data/database.db")
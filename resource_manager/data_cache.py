@@ -0,0 +1,149 @@
+import os
+import threading
+
+import numpy as np
+
+from resource_manager.connection_pool import get_connection_pool, get_database_version, clear_connection_pools
+from resource_manager.snapshot import load_snapshot
+
+# process-wide, read-only cache of the scenario database
+# one DataCache per database file; a cache is replaced as soon as the file's
+# modification time or size changes (e.g. after pages/05_Data_Management.py rebuilds it)
+_caches = {}
+_lock = threading.Lock()
+
+
+def get_data_cache(database_path):
+    database_path = os.path.abspath(database_path)
+    # without the database file the tables can only come from its snapshot
+    version = get_database_version(database_path) if os.path.exists(database_path) else None
+
+    with _lock:
+        cache = _caches.get(database_path)
+        if cache is None or cache.version != version:
+            cache = DataCache(database_path, version)
+            _caches[database_path] = cache
+        return cache
+
+
+def clear_data_cache(database_path=None):
+    with _lock:
+        if database_path is None:
+            _caches.clear()
+        else:
+            _caches.pop(os.path.abspath(database_path), None)
+    clear_connection_pools(database_path)
+
+
+def match_key(value):
+    # mirrors sqlite's type affinity when comparing query parameters with stored values,
+    # e.g. o_m_ratio is stored as TEXT '0.15' but queried with the float 0.15
+    if isinstance(value, bool):
+        return float(value)
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return value
+    return value
+
+
+def take_rows(column, rows):
+    # columns are lists, or memory-mapped arrays and encoded text columns when loaded from a snapshot;
+    # the result is always a fresh list of python values
+    if isinstance(column, list):
+        return [column[i] for i in rows]
+    rows = np.asarray(rows, dtype=np.intp)
+    if isinstance(column, np.ndarray):
+        return column[rows].tolist()
+    return column.take(rows)
+
+
+class DataCache:
+    def __init__(self, database_path, version):
+        self.database_path = database_path
+        self.version = version
+        self.tables = {}
+        self.indexes = {}
+        self.derived = {}
+        self.snapshot = None
+        self.snapshot_checked = False
+        self.lock = threading.Lock()
+
+    def get_table(self, table):
+        with self.lock:
+            if table not in self.tables:
+                self.tables[table] = self.load_table(table)
+            return self.tables[table]
+
+    # values computed from the tables (e.g. scaled baseline time series), dropped with the cache when
+    # the database changes; build runs outside the lock as it may read tables itself
+    def get_derived(self, key, build):
+        with self.lock:
+            if key in self.derived:
+                return self.derived[key]
+
+        value = build()
+        with self.lock:
+            return self.derived.setdefault(key, value)
+
+    def get_snapshot(self):
+        if not self.snapshot_checked:
+            self.snapshot = load_snapshot(self.database_path)
+            self.snapshot_checked = True
+        return self.snapshot
+
+    def load_table(self, table):
+        # from the compiled snapshot when there is an up-to-date one (see resource_manager/snapshot.py)
+        snapshot = self.get_snapshot()
+        if snapshot is not None and snapshot.has_table(table):
+            return snapshot.load_table(table)
+        return get_connection_pool(self.database_path).select(table)
+
+    def get_column(self, table, column):
+        # sqlite column names are case-insensitive, e.g. BECCS vs beccs
+        data = self.get_table(table)
+        if column in data:
+            return column
+        for c in data.keys():
+            if c.lower() == column.lower():
+                return c
+        raise KeyError(f"no such column: {table}.{column}")
+
+    def get_index(self, table, columns):
+        data = self.get_table(table)
+        columns = tuple(self.get_column(table, c) for c in columns)
+        with self.lock:
+            if (table, columns) not in self.indexes:
+                index = {}
+                values = [take_rows(data[c], range(len(data[c]))) for c in columns]
+                for i, row in enumerate(zip(*values)):
+                    key = tuple(match_key(v) for v in row)
+                    index.setdefault(key, []).append(i)
+                self.indexes[(table, columns)] = index
+            return self.indexes[(table, columns)]
+
+    def select(self, table, columns=None, where=None, order_by=None):
+        data = self.get_table(table)
+        if columns is None:
+            columns = list(data.keys())
+
+        if where:
+            where_columns = tuple(where.keys())
+            key = tuple(match_key(v) for v in where.values())
+            rows = self.get_index(table, where_columns).get(key, [])
+        else:
+            rows = range(len(next(iter(data.values()), [])))
+
+        if order_by is not None:
+            order_column = data[self.get_column(table, order_by)]
+            rows = sorted(rows, key=lambda i: order_column[i])
+
+        # fresh lists, so callers may mutate the results without touching the cache
+        result = {}
+        for c in columns:
+            column = data[self.get_column(table, c)]
+            result[c] = take_rows(column, rows)
+        return result
@@ -1,51 +1,97 @@
 import os
-import sqlite3
-import pandas as pd
+
+import numpy as np
+
+from optigob import profiling
+from resource_manager.connection_pool import get_connection_pool
+from resource_manager.data_cache import get_data_cache, match_key
+
+TABLES = ["existing_forest", "afforestation", "nz_calc_included", "ad_biomethane_strategy", "additional_ad",
+          "willow_beccs", "cattle", "non_cattle", "scalers", "organic_soils"]
+
+FORESTRY_COLUMNS = ["area", "area_unit", "hnv_area", "hnv_area_unit", "organic_soil_area", "organic_soil_area_unit",
+                    "ghg_fluxes", "ghg_fluxes_unit", "harvest_volume", "harvest_volume_unit", "hwp_c_storage",
+                    "hwp_c_storage_unit", "beccs", "beccs_unit", "hwp_material_substitution_credit",
+                    "hwp_material_substitution_credit_unit", "wood_energy", "wood_energy_unit",
+                    "hwp_energy_substitution_credit", "hwp_energy_substitution_credit_unit"]
+AD_BIOMETHANE_COLUMNS = ["biomethane_energy", "area", "hnv_area", "co2", "ch4", "n2o", "co2_substitution_credit",
+                         "ch4_substitution_credit", "n2o_substitution_credit", "BECCS"]
+ADDITIONAL_AD_COLUMNS = ["biomethane_energy", "grass_dry_matter", "area", "hnv_area", "co2", "ch4", "n2o", "nh3",
+                         "n_to_water_emissions", "p_to_water_emissions", "co2_emission_credit", "beccs"]
+WILLOW_COLUMNS = ["willow", "willow_dry_matter", "area", "hnv_area", "lulucf_co2_emissions_credit",
+                  "co2_substitution_credit", "BECCS"]
 
 class DatabaseManager:
-    def __init__(self, database_path):
+    def __init__(self, database_path, use_cache=True, immutable=False):
         self.database_path = os.path.abspath(database_path)
-        self.conn = sqlite3.connect(database_path)
+        self.use_cache = use_cache
+        self.immutable = immutable
+
+    def select(self, table, columns=None, where=None, order_by=None):
+        # table names end up in the sql, so only known tables are accepted
+        if table not in TABLES:
+            raise ValueError(f"unknown table: {table}")
+        # lookups, mostly served from the DataCache; the sql that actually runs is counted by the connection pool
+        with profiling.timer("db_lookup", table):
+            data = self.select_data(table, columns, where, order_by)
+
+        profiling.count("db_lookups", field=table)
+        profiling.count("db_lookup_rows", len(next(iter(data.values()), [])), field=table)
+        return data
+
+    def get_derived(self, key, build):
+        if self.use_cache:
+            return get_data_cache(self.database_path).get_derived(key, build)
+        return build()
+
+    def select_data(self, table, columns, where, order_by):
+        if self.use_cache:
+            return get_data_cache(self.database_path).select(table, columns, where, order_by)
+        return get_connection_pool(self.database_path, self.immutable).select(table, columns, where, order_by)
+
+    def get_forestry_series(self, table, dimensions):
+        # every base trajectory of a forestry table, loaded once per database version and keyed by the
+        # values of the scenario dimensions; numeric columns are arrays, unit columns lists
+        def build():
+            data = self.select(table, columns=dimensions + FORESTRY_COLUMNS, order_by="year")
+            rows = {}
+            for i, key in enumerate(zip(*[data[d] for d in dimensions])):
+                rows.setdefault(tuple(match_key(k) for k in key), []).append(i)
+
+            series = {}
+            for key, index in rows.items():
+                series[key] = {}
+                for c in FORESTRY_COLUMNS:
+                    values = [data[c][i] for i in index]
+                    if isinstance(values[0], (int, float)):
+                        values = np.asarray(values, dtype=np.float64)
+                    series[key][c] = values
+            return series
+        return self.get_derived(("forestry_series", table), build)
+
+    def get_forestry_trajectory(self, table, dimensions, key, scaler=None):
+        series = self.get_forestry_series(table, dimensions)
+        key = tuple(match_key(k) for k in key)
+        if key not in series:
+            raise KeyError(f"no {table} data for {dict(zip(dimensions, key))}")
+
+        kwargs = {}
+        for c, values in series[key].items():
+            if isinstance(values, np.ndarray):
+                kwargs[c] = (values if scaler is None else scaler * values).tolist()
+            else:
+                kwargs[c] = list(values)
+        return kwargs
 
     def get_existing_forest_data(self,
                                  harvest="high",
                                  ccs=True):
-        query = """
-            SELECT
-                area,
-                area_unit,
-                hnv_area,
-                hnv_area_unit,
-                organic_soil_area,
-                organic_soil_area_unit,
-                ghg_fluxes,
-                ghg_fluxes_unit,
-                harvest_volume,
-                harvest_volume_unit,
-                hwp_c_storage,
-                hwp_c_storage_unit,
-                beccs,
-                beccs_unit,
-                hwp_material_substitution_credit,
-                hwp_material_substitution_credit_unit,
-                wood_energy,
-                wood_energy_unit,
-                hwp_energy_substitution_credit,
-                hwp_energy_substitution_credit_unit 
-            FROM existing_forest
-            WHERE harvest_rate = ?
-                  AND ccs = ?
-            ORDER BY year;
-        """
         if ccs:
             ccs = "yes"
         else:
             ccs = "no"
 
-        params = (harvest, ccs)
-        df = pd.read_sql_query(query, self.conn, params=params)
-        kwargs = df.to_dict(orient="list")
-        return kwargs
+        return self.get_forestry_trajectory("existing_forest", ["harvest_rate", "ccs"], (harvest, ccs))
 
     def get_afforestation_data(self,
                                affor_rate=2,
@@ -54,90 +100,41 @@ class DatabaseManager:
                                harvest="high",
                                ccs=True):
 
-        if organic_soil_frac == 0:
-            organic_soil_frac = "0"
-
-        query = """
-            SELECT
-                area, 
-                area_unit, 
-                hnv_area, 
-                hnv_area_unit, 
-                organic_soil_area, 
-                organic_soil_area_unit, 
-                ghg_fluxes, 
-                ghg_fluxes_unit, 
-                harvest_volume, 
-                harvest_volume_unit, 
-                hwp_c_storage, 
-                hwp_c_storage_unit, 
-                beccs, 
-                beccs_unit, 
-                hwp_material_substitution_credit, 
-                hwp_material_substitution_credit_unit, 
-                wood_energy, 
-                wood_energy_unit, 
-                hwp_energy_substitution_credit, 
-                hwp_energy_substitution_credit_unit
-            FROM afforestation
-            WHERE harvest_rate = ?
-                  AND ccs = ?
-                  AND bl_c_ratio = ?
-                  AND o_m_ratio = ?
-            ORDER BY year;
-        """
         if ccs:
             ccs = "yes"
         else:
             ccs = "no"
 
-        params = (harvest, ccs, broadleaf_frac, organic_soil_frac)
-        df = pd.read_sql_query(query, self.conn, params=params)
-
-        kwargs = df.to_dict(orient="list")
-        for key, value in kwargs.items():
-            if isinstance(value[0], int) or isinstance(value[0], float):
-                scaled_values = []
-                for v in value:
-                    scaled_values.append(affor_rate * v)
-                kwargs[key] = scaled_values
-
-        return kwargs
+        # the base trajectories are per unit of afforestation rate
+        return self.get_forestry_trajectory("afforestation",
+                                            ["harvest_rate", "ccs", "bl_c_ratio", "o_m_ratio"],
+                                            (harvest, ccs, broadleaf_frac, organic_soil_frac),
+                                            scaler=affor_rate)
 
     def get_nz_metrics(self,
                        system_name,
                        ccs):
         col = "ccs" if ccs else "no_ccs"
 
-        query = f"""
-            SELECT DISTINCT 
-                metric 
-            FROM 
-                nz_calc_included 
-            WHERE 
-                system = ?
-                AND {col} = 'yes';
-        """
+        def build():
+            data = self.select("nz_calc_included",
+                               columns=["metric"],
+                               where={"system": system_name, col: "yes"})
 
-        df = pd.read_sql_query(query, self.conn, params=(system_name,))
-        return df["metric"].tolist()
+            metrics = []
+            for metric in data["metric"]:
+                if metric not in metrics:
+                    metrics.append(metric)
+            return metrics
+        return list(self.get_derived(("nz_metrics", system_name, col), build))
 
     def get_agriculture_data(self, abatement="2020 BL", productivity="2020 BL", agriculture="non_cattle", system="Pigs"):
-        query = f"""
-            SELECT
-                metric,
-                unit,
-                value
-            FROM {agriculture}
-            WHERE Abatement = ?
-                    AND Productivity = ?
-                    AND System = ?
-        """
-        params = (abatement, productivity, system)
-        df = pd.read_sql_query(query, self.conn, params=params)
-        metric = df.get("metric").to_list()
-        unit = df.get("unit").to_list()
-        value = df.get("value").to_list()
+        data = self.select(agriculture,
+                           columns=["metric", "unit", "value"],
+                           where={"Abatement": abatement, "Productivity": productivity, "System": system})
+        metric = data["metric"]
+        unit = data["unit"]
+        value = data["value"]
 
         kwargs = {}
         for i in range(len(metric)):
@@ -147,25 +144,17 @@ class DatabaseManager:
         return kwargs
 
     def get_scalers(self):
-        query = "SELECT * FROM scalers"
-        df = pd.read_sql_query(query, self.conn)
-        return df
+        # {column: array}, "Year" and one scaler column per system; numpy columns index to numpy scalars like
+        # the DataFrame columns this used to return, which update_by_scaler relies on
+        return {key: np.asarray(values) for key, values in self.select("scalers").items()}
 
     def get_organic_soils(self, name="Organic soil under grass", drainage_status="Drained"):
-        query = """
-            SELECT
-                metric,
-                unit,
-                value
-            FROM organic_soils
-            WHERE "Organic soil type" = ?
-                    AND "Drainage status" = ?
-        """
-        params = (name, drainage_status)
-        df = pd.read_sql_query(query, self.conn, params=params)
-        metric = df.get("metric").to_list()
-        unit = df.get("unit").to_list()
-        value = df.get("value").to_list()
+        data = self.select("organic_soils",
+                           columns=["metric", "unit", "value"],
+                           where={"Organic soil type": name, "Drainage status": drainage_status})
+        metric = data["metric"]
+        unit = data["unit"]
+        value = data["value"]
 
         kwargs = {}
         for i in range(len(metric)):
@@ -174,6 +163,13 @@ class DatabaseManager:
 
         return kwargs
 
+    def get_ad_series(self, table, columns, ccs):
+        # base series of an AD table as arrays, loaded once per database version
+        def build():
+            data = self.select(table, columns=columns, where={"ccs": ccs})
+            return {key: np.asarray(values) for key, values in data.items()}
+        return self.get_derived(("ad_series", table, ccs), build)
+
     def get_ad_emissions(self, implementation_year, ccs, additional_biomethane_year, additional_grass_biomethane, willow_year, cdr_bioenergy):
         implementation_offset = 2030 # year in the dataset when biomethane strategy is implemented
         additional_biomethane_offset = 2035
@@ -181,109 +177,22 @@ class DatabaseManager:
         willow_offset = 2040
         willow_scaler = 1000.0
 
-        query = """
-            SELECT
-                biomethane_energy,
-                area,
-                hnv_area,
-                co2,
-                ch4,
-                n2o,
-                co2_substitution_credit,
-                ch4_substitution_credit,
-                n2o_substitution_credit,
-            	BECCS
-            FROM ad_biomethane_strategy
-            WHERE ccs = ?
-        """
         ccs = "yes" if ccs else "no"
-        params = (ccs,)
-        df = pd.read_sql_query(query, self.conn, params=params)
-
-        kwargs = df.to_dict(orient="list")
-        offset = implementation_year - implementation_offset
-        while offset < 0:
-            for _, values in kwargs.items():
-                del values[0]
-                values.append(values[-1])
-            offset += 1
-        while offset > 0:
-            for key, values in kwargs.items():
-                kwargs[key] = [values[0]] + values
-                del kwargs[key][-1]
-            offset -= 1
-
-        query = """
-            SELECT
-                biomethane_energy,
-                grass_dry_matter,
-                area,
-                hnv_area,
-                co2,
-                ch4,
-                n2o,
-                nh3,
-                n_to_water_emissions,
-                p_to_water_emissions,
-                co2_emission_credit,
-                beccs
-            FROM additional_ad
-            WHERE ccs = ?
-        """
-        df = pd.read_sql_query(query, self.conn, params=params)
-
-        additional_kwargs = df.to_dict(orient="list")
-        offset = additional_biomethane_year - additional_biomethane_offset
-        while offset < 0:
-            for key, values in additional_kwargs.items():
-                del values[0]
-                values.append(values[-1])
-            offset += 1
-        while offset > 0:
-            for key, values in additional_kwargs.items():
-                additional_kwargs[key] = [values[0]] + values
-                del additional_kwargs[key][-1]
-            offset -= 1
-
-        scaler = additional_grass_biomethane / additional_biomethane_scaler
-        for key, values in additional_kwargs.items():
-            if isinstance(values[0], int) or isinstance(values[0], float):
-                for i in range(len(values)):
-                    values[i] *= scaler
-            kwargs["additional_" + key] = values
-
-        query = """
-            SELECT
-                willow,
-                willow_dry_matter,
-                area,
-                hnv_area,
-                lulucf_co2_emissions_credit,
-                co2_substitution_credit,
-                BECCS            
-            FROM willow_beccs
-            WHERE ccs = ?
-        """
-        df = pd.read_sql_query(query, self.conn, params=params)
-
-        willow_kwargs = df.to_dict(orient="list")
-        offset = willow_year - willow_offset
-        while offset < 0:
-            for _, values in willow_kwargs.items():
-                del values[0]
-                values.append(values[-1])
-            offset += 1
-        while offset > 0:
-            for key, values in willow_kwargs.items():
-                willow_kwargs[key] = [values[0]] + values
-                del willow_kwargs[key][-1]
-            offset -= 1
-
-        scaler = cdr_bioenergy / willow_scaler
-        for key, values in willow_kwargs.items():
-            if isinstance(values[0], int) or isinstance(values[0], float):
-                for i in range(len(values)):
-                    values[i] *= scaler
-            kwargs["willow_" + key] = values
-
-        return kwargs
\ No newline at end of file
+        kwargs = {}
+        for (table, columns, prefix, offset, scaler) in [
+                ("ad_biomethane_strategy", AD_BIOMETHANE_COLUMNS, "", implementation_year - implementation_offset, None),
+                ("additional_ad", ADDITIONAL_AD_COLUMNS, "additional_", additional_biomethane_year - additional_biomethane_offset, additional_grass_biomethane / additional_biomethane_scaler),
+                ("willow_beccs", WILLOW_COLUMNS, "willow_", willow_year - willow_offset, cdr_bioenergy / willow_scaler)]:
+            series = self.get_ad_series(table, columns, ccs)
+
+            # shifting by offset years: later implementation repeats the first year, earlier implementation
+            # drops the first years and repeats the last one
+            n = len(next(iter(series.values()), []))
+            index = np.clip(np.arange(n) - offset, 0, max(n - 1, 0))
+            for key, values in series.items():
+                values = values[index]
+                if scaler is not None and np.issubdtype(values.dtype, np.number):
+                    values = values * scaler
+                kwargs[prefix + key] = values.tolist()
+
+        return kwargs
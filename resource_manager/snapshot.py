@@ -0,0 +1,162 @@
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import sys
+from datetime import datetime
+from urllib.parse import quote
+
+import numpy as np
+
+# compiled, read-only copy of the scenario database: one .npy file per numeric column, memory-mapped on load so
+# processes share the pages through the OS page cache, and dictionary-encoded text columns (int32 codes per row,
+# the distinct values in the manifest); the manifest records the size, modification time and sha256 of the database
+# it was compiled from, loading only compares the size and modification time so the file is never read, and a
+# snapshot without its database (e.g. a deployment that only ships the snapshot) is used as it is
+SNAPSHOT_VERSION = 2
+MANIFEST_FILE = "manifest.json"
+
+
+def get_snapshot_path(database_path):
+    return os.path.splitext(os.path.abspath(database_path))[0] + ".snapshot"
+
+
+def get_file_hash(file_path):
+    sha256 = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            sha256.update(block)
+    return sha256.hexdigest()
+
+
+class EncodedColumn:
+    # dictionary-encoded text column, indexes like a list
+
+    def __init__(self, codes, dictionary):
+        self.codes = codes
+        self.dictionary = dictionary
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, i):
+        return self.dictionary[self.codes[i]]
+
+    def take(self, rows):
+        dictionary = self.dictionary
+        return [dictionary[c] for c in self.codes[rows].tolist()]
+
+
+def encode_column(values):
+    if all(type(v) is int for v in values):
+        return "int64", np.array(values, dtype=np.int64), None
+    if all(type(v) in (int, float) for v in values):
+        return "float64", np.array(values, dtype=np.float64), None
+
+    dictionary = list(dict.fromkeys(values))
+    positions = {v: i for i, v in enumerate(dictionary)}
+    return "codes", np.array([positions[v] for v in values], dtype=np.int32), dictionary
+
+
+def compile_snapshot(database_path, snapshot_path=None, tables=None):
+    from resource_manager.database_manager import TABLES
+
+    snapshot_path = snapshot_path or get_snapshot_path(database_path)
+    tables = tables or TABLES
+
+    # written next to the target and swapped in at the end, readers never see a partial snapshot
+    tmp_path = snapshot_path + ".tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+
+    stat = os.stat(database_path)
+    manifest = {"snapshot_version": SNAPSHOT_VERSION,
+                "database_size": stat.st_size,
+                "database_mtime_ns": stat.st_mtime_ns,
+                "database_sha256": get_file_hash(database_path),
+                "created": datetime.now().isoformat(timespec="seconds"),
+                "tables": {}}
+
+    conn = sqlite3.connect("file:" + quote(os.path.abspath(database_path)) + "?mode=ro", uri=True)
+    try:
+        for table in tables:
+            cursor = conn.execute(f'SELECT * FROM "{table}"')
+            names = [d[0] for d in cursor.description]
+            rows = cursor.fetchall()
+
+            columns = []
+            for i, name in enumerate(names):
+                (kind, array, dictionary) = encode_column([row[i] for row in rows])
+                file_name = f"{table}.{i}.npy"
+                np.save(os.path.join(tmp_path, file_name), array)
+                columns.append({"name": name, "kind": kind, "file": file_name, "dictionary": dictionary})
+            manifest["tables"][table] = {"rows": len(rows), "columns": columns}
+    finally:
+        conn.close()
+
+    with open(os.path.join(tmp_path, MANIFEST_FILE), "w") as f:
+        json.dump(manifest, f, indent=1)
+
+    shutil.rmtree(snapshot_path, ignore_errors=True)
+    os.rename(tmp_path, snapshot_path)
+    return snapshot_path
+
+
+class Snapshot:
+    def __init__(self, snapshot_path):
+        self.snapshot_path = snapshot_path
+        with open(os.path.join(snapshot_path, MANIFEST_FILE)) as f:
+            self.manifest = json.load(f)
+
+    def is_current(self, database_path):
+        # snapshots of an older format are ignored like outdated ones until they are recompiled
+        if self.manifest["snapshot_version"] != SNAPSHOT_VERSION:
+            return False
+        if not os.path.exists(database_path):
+            return True
+        stat = os.stat(database_path)
+        return (self.manifest["database_size"] == stat.st_size
+                and self.manifest["database_mtime_ns"] == stat.st_mtime_ns)
+
+    def has_table(self, table):
+        return table in self.manifest["tables"]
+
+    def load_table(self, table):
+        # {column: array or EncodedColumn}, the arrays are read-only memory maps of the .npy files
+        # (empty files cannot be memory-mapped)
+        mmap_mode = "r" if self.manifest["tables"][table]["rows"] > 0 else None
+        data = {}
+        for column in self.manifest["tables"][table]["columns"]:
+            array = np.load(os.path.join(self.snapshot_path, column["file"]), mmap_mode=mmap_mode)
+            if column["kind"] == "codes":
+                data[column["name"]] = EncodedColumn(array, column["dictionary"])
+            else:
+                data[column["name"]] = array
+        return data
+
+
+def load_snapshot(database_path):
+    # the snapshot compiled from this database, None if there is none or the database changed since;
+    # the database itself does not need to exist
+    snapshot_path = get_snapshot_path(database_path)
+    if not os.path.exists(os.path.join(snapshot_path, MANIFEST_FILE)):
+        return None
+    snapshot = Snapshot(snapshot_path)
+    if not snapshot.is_current(database_path):
+        return None
+    return snapshot
+
+
+def get_database_digest(database_path):
+    # sha256 of the database content, read from an up-to-date snapshot when there is one
+    snapshot = load_snapshot(database_path)
+    if snapshot is not None:
+        return snapshot.manifest["database_sha256"]
+    return get_file_hash(database_path)
+
+
+if __name__ == "__main__":
+    # python -m resource_manager.snapshot [data/database.db]
+    database_path = sys.argv[1] if len(sys.argv) > 1 else "data/database.db"
+    print("Snapshot written to " + compile_snapshot(database_path))
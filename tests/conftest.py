@@ -0,0 +1,11 @@
+import copy
+
+import pytest
+
+from tests import configs
+
+
+@pytest.fixture
+def config1():
+    # a fresh copy for every test, so tests may modify it
+    return copy.deepcopy(configs.config1)
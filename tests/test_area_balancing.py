@@ -1,11 +1,11 @@
 from optigob.optigob import Optigob
 from configuration.keys import *
+from tests.configs import config1
+import copy
 import pytest
 
 db_file_path = "data/database.db"
 
-config1 = {"baseline_year":2020,"target_year":2100,"forestry":[{"name":"existing_forest","harvest":"high","ccs":True},{"name":"afforestation","afforestation_rate":5,"broadleaf_frac":0.5,"organic_soil":0.15,"harvest":"high","ccs":True}],"organic_soils":[{"name":"Organic soil under grass","drainage_status":["Drained","Rewetted"],"waypoints":[{"year":2030,"rewetting_ratio":0},{"year":2040,"rewetting_ratio":0.2}]},{"name":"Near natural wetlands","drainage_status":["Natural"]},{"name":"Industrial peat","drainage_status":["Drained","Rewetted"],"waypoints":[{"year":2030,"rewetting_ratio":0},{"year":2040,"rewetting_ratio":0.15}]},{"name":"Domestic peat","drainage_status":["Drained","Rewetted"],"waypoints":[{"year":2030,"rewetting_ratio":0},{"year":2040,"rewetting_ratio":0.15}]}],"non_cattle_agriculture":[{"name":"Pigs","abatement":"2020 BL","productivity":"2020 Prod","waypoints":[{"year":2030,"abatement":"2020 BL","productivity":"2020 Prod","scaler":1,"scale_parameter":"co2e","scale_absolute_or_percentage":False},{"year":2040,"abatement":"MACC","productivity":"2020 Prod","scaler":0.9,"scale_parameter":"co2e","scale_absolute_or_percentage":False}]},{"name":"Poultry","abatement":"2020 BL","productivity":"2020 Prod","waypoints":[{"year":2030,"abatement":"2020 BL","productivity":"2020 Prod","scaler":1,"scale_parameter":"co2e","scale_absolute_or_percentage":False},{"year":2040,"abatement":"MACC","productivity":"2020 Prod","scaler":0.9,"scale_parameter":"co2e","scale_absolute_or_percentage":False}]},{"name":"Sheep","abatement":"2020 BL","productivity":"2020 Prod","waypoints":[{"year":2030,"abatement":"2020 BL","productivity":"2020 Prod","scaler":1,"scale_parameter":"co2e","scale_absolute_or_percentage":False},{"year":2045,"abatement":"2020 BL","productivity":"2020 Prod","scaler":0.8,"scale_parameter":"co2e","scale_absolute_or_percentage":False}]},{"name":"Crops","abatement":"2020 BL","productivity":"2020 Prod","waypoints":[{"year":2030,"abatement":"2020 BL","productivity":"2020 Prod","scaler":1,"scale_parameter":"co2e","scale_absolute_or_percentage":False},{"year":2040,"abatement":"2020 BL","productivity":"2020 Prod","scaler":0.9,"scale_parameter":"co2e","scale_absolute_or_percentage":False}]}],"cattle_systems":{"abatement":"2020 BL","productivity":"2020 Prod","waypoints":[{"year":2030,"abatement":"2020 BL","scaler":1,"scale_parameter":"co2e","scale_absolute_or_percentage":False,"dairy_productivity":"2020 Prod","beef_productivity":"2020 Prod"},{"year":2040,"abatement":"2020 BL","scaler":0.8,"scale_parameter":"co2e","scale_absolute_or_percentage":False,"dairy_productivity":"Medium increase","beef_productivity":"Medium increase"},{"year":2050,"abatement":"MACC","scaler":0.5,"scale_parameter":"co2e","scale_absolute_or_percentage":False,"dairy_productivity":"Strong increase","beef_productivity":"Strong increase"}]},"ad_emissions":{"implementation_year":2035,"ccs":True,"additional_biomethane_year":2040,"additional_grass_biomethane":2000,"willow_year":2045,"cdr_bioenergy":5}}
-
 @pytest.mark.parametrize(
     "config",
     [
@@ -96,4 +96,42 @@ def test_area_balancing_spared_cattle_sheep_area(config):
     ],
 )
 def test_organic_soils_balancing(config):
-    pass
\ No newline at end of file
+    pass
+
+
+def update(config, path, value):
+    new_config = copy.deepcopy(config)
+    entry = new_config
+    for key in path[:-1]:
+        entry = entry[key]
+    if value is None:
+        del entry[path[-1]]
+    else:
+        entry[path[-1]] = value
+    return new_config
+
+@pytest.mark.parametrize(
+    "path,value,expected_dirty",
+    [
+        (["organic_soils", 0, "waypoints", 1, "rewetting_ratio"], 0.5, {ORGANIC_SOILS}),
+        (["cattle_systems", "waypoints", 2, "scaler"], 0.3, {CATTLE_AGRICULTURE}),
+        (["non_cattle_agriculture", 2, "waypoints", 1, "scaler"], 0.5, {NON_CATTLE_AGRICULTURE, CATTLE_AGRICULTURE}),
+        (["forestry", 1, "afforestation_rate"], 8, {FORESTRY, CATTLE_AGRICULTURE, ORGANIC_SOILS}),
+        (["ad_emissions"], None, {CATTLE_AGRICULTURE}),
+        (["target_year"], 2070, {FORESTRY, NON_CATTLE_AGRICULTURE, CATTLE_AGRICULTURE, ORGANIC_SOILS, AD_EMISSIONS}),
+    ],
+)
+def test_update_config(path, value, expected_dirty):
+    new_config = update(config1, path, value)
+
+    optigob = Optigob(json_config=config1, db_file_path=db_file_path)
+    optigob.run()
+    optigob.get_evaluation(CO2E)
+    dirty = optigob.update_config(new_config)
+
+    expected = Optigob(json_config=new_config, db_file_path=db_file_path)
+    expected.run()
+
+    assert set(dirty) == expected_dirty
+    for parameter in [CO2E, AREA, PROTEIN, BIO_ENERGY, HWP, SUBSTITUTION, BIODIVERSITY]:
+        assert optigob.get_evaluation(parameter) == expected.get_evaluation(parameter)
@@ -0,0 +1,34 @@
+from optigob.optigob import Optigob
+from optigob.batch import evaluate_batch
+from moo.optigob_problem import build_json_config, heal_variables, DEFAULT_LOWER_BOUND, DEFAULT_UPPER_BOUND
+from configuration.keys import *
+import random
+import pytest
+
+db_file_path = "data/database.db"
+
+def random_variables(seed):
+    rng = random.Random(seed)
+    variables = [rng.randint(lb, ub) for (lb, ub) in zip(DEFAULT_LOWER_BOUND, DEFAULT_UPPER_BOUND)]
+    return heal_variables(variables, DEFAULT_UPPER_BOUND)
+
+@pytest.mark.parametrize("parameter", [CO2E, AREA, PROTEIN, HWP, BIODIVERSITY])
+def test_batch_matches_single_runs(parameter):
+    vectors = [random_variables(seed) for seed in [1, 2, 1]]
+    result = evaluate_batch(vectors, db_file_path, parameters=[parameter], config_builder=build_json_config)
+
+    for i, variables in enumerate(vectors):
+        optigob = Optigob(json_config=build_json_config(variables), db_file_path=db_file_path)
+        optigob.run()
+        for (label, series) in optigob.get_evaluation(parameter):
+            assert list(result.get(parameter, label)[i]) == pytest.approx(series)
+
+    assert list(result.values[parameter][0].reshape(-1)) == list(result.values[parameter][2].reshape(-1))
+
+def test_batch_to_frame():
+    result = evaluate_batch([random_variables(4), random_variables(5)], db_file_path, parameters=[CO2E], config_builder=build_json_config)
+    df = result.to_frame()
+
+    assert len(df) == result.values[CO2E].size
+    total = df[(df["scenario"] == 1) & (df["label"].str.contains("total_"))]["value"].sum()
+    assert total == pytest.approx(result.get_objective(CO2E)[1])
@@ -0,0 +1,81 @@
+import copy
+import json
+
+import numpy as np
+import pytest
+
+from optigob.optigob import Optigob
+from optigob.config_hash import canonicalise_config, get_config_hash
+from configuration.keys import *
+
+db_file_path = "data/database.db"
+
+def reorder_keys(value):
+    if isinstance(value, dict):
+        return {key: reorder_keys(value[key]) for key in reversed(list(value.keys()))}
+    if isinstance(value, list):
+        return [reorder_keys(v) for v in value]
+    return value
+
+def reverse_waypoints(config):
+    config = copy.deepcopy(config)
+    for s in config[NON_CATTLE_AGRICULTURE] + config[ORGANIC_SOILS] + [config[CATTLE_AGRICULTURE]]:
+        if WAY_POINTS in s:
+            s[WAY_POINTS].reverse()
+    return config
+
+def with_floats(config):
+    config = copy.deepcopy(config)
+    config[FORESTRY][1]["afforestation_rate"] = 5.0
+    config[AD_EMISSIONS]["implementation_year"] = np.int64(2035)
+    config[NON_CATTLE_AGRICULTURE][0][WAY_POINTS][0]["scaler"] = 1.0
+    return config
+
+def with_defaults(config):
+    config = copy.deepcopy(config)
+    config[CO2E_METRIC] = "default"
+    config[ORGANIC_SOILS][1][WAY_POINTS] = []
+    return config
+
+@pytest.mark.parametrize("transform", [reorder_keys, reverse_waypoints, with_floats, with_defaults,
+                                       lambda c: json.loads(json.dumps(c))])
+def test_equivalent_configs(config1, transform):
+    config = transform(config1)
+    assert canonicalise_config(config) == canonicalise_config(config1)
+    assert get_config_hash(config) == get_config_hash(config1)
+
+def test_different_configs(config1):
+    hashes = {get_config_hash(config1)}
+    for (key, value) in [("afforestation_rate", 5.5), ("harvest", "low"), ("ccs", False)]:
+        config = copy.deepcopy(config1)
+        config[FORESTRY][1][key] = value
+        hashes.add(get_config_hash(config))
+
+    config = copy.deepcopy(config1)
+    config[CO2E_METRIC] = "AR5"
+    hashes.add(get_config_hash(config))
+    assert len(hashes) == 5
+
+    # the canonical form keeps the input as it is
+    config = reverse_waypoints(config1)
+    canonicalise_config(config)
+    assert config == reverse_waypoints(config1)
+
+    with pytest.raises(ValueError):
+        get_config_hash({**config1, TARGET_YEAR: float("nan")})
+
+def test_stable_hash():
+    # pinned, the hash must not change across processes and python versions
+    assert get_config_hash({BASELINE_YEAR: 2020.0, TARGET_YEAR: 2050, CO2E_METRIC: "default"}) == \
+        get_config_hash({TARGET_YEAR: 2050, BASELINE_YEAR: 2020})
+    assert get_config_hash({BASELINE_YEAR: 2020, TARGET_YEAR: 2050}) == \
+        "a4db5b5602c3bf472f6047f482d4d0098af6e88aa1a39276de01b7f606fb96fb"
+
+def test_waypoint_order(config1):
+    # equal hashes simulate the same scenario
+    optigob = Optigob(json_config=config1, db_file_path=db_file_path)
+    optigob.run()
+    reversed_optigob = Optigob(json_config=reverse_waypoints(config1), db_file_path=db_file_path)
+    reversed_optigob.run()
+    for parameter in [CO2E, AREA, PROTEIN]:
+        assert reversed_optigob.get_evaluation(parameter) == optigob.get_evaluation(parameter)
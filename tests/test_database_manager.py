@@ -0,0 +1,238 @@
+import os
+import shutil
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from resource_manager.database_manager import DatabaseManager
+from resource_manager.connection_pool import get_connection_pool
+from resource_manager.create_database import read_forestry, read_animals, SCHEMA_VERSION
+from resource_manager.data_cache import get_data_cache, clear_data_cache
+from resource_manager.snapshot import compile_snapshot, load_snapshot
+from optigob.optigob import Optigob
+from configuration.keys import *
+import pytest
+
+db_file_path = "data/database.db"
+
+GETTER_CASES = [
+        ("get_existing_forest_data", {"harvest": "low", "ccs": False}),
+        ("get_afforestation_data", {"affor_rate": 2, "broadleaf_frac": 0.3, "organic_soil_frac": 0, "harvest": "high", "ccs": True}),
+        ("get_afforestation_data", {"affor_rate": 0.5, "broadleaf_frac": 0.5, "organic_soil_frac": 0.15, "harvest": "low", "ccs": False}),
+        ("get_nz_metrics", {"system_name": "existing_forest", "ccs": True}),
+        ("get_agriculture_data", {"abatement": "MACC", "productivity": "Medium increase", "agriculture": "cattle", "system": "Dairy"}),
+        ("get_agriculture_data", {"abatement": "Frontier", "productivity": "2020 Prod", "agriculture": "non_cattle", "system": "Sheep"}),
+        ("get_organic_soils", {"name": "Industrial peat", "drainage_status": "Rewetted"}),
+        ("get_ad_emissions", {"implementation_year": 2025, "ccs": True, "additional_biomethane_year": 2045, "additional_grass_biomethane": 2000, "willow_year": 2030, "cdr_bioenergy": 5}),
+]
+
+@pytest.mark.parametrize("getter, kwargs", GETTER_CASES)
+def test_cache_matches_sql(getter, kwargs):
+    cached = getattr(DatabaseManager(db_file_path), getter)(**kwargs)
+    uncached = getattr(DatabaseManager(db_file_path, use_cache=False), getter)(**kwargs)
+
+    assert cached == uncached
+
+def test_cache_scalers():
+    cached = DatabaseManager(db_file_path).get_scalers()
+    uncached = DatabaseManager(db_file_path, use_cache=False).get_scalers()
+
+    assert cached.keys() == uncached.keys()
+    assert all(np.array_equal(cached[key], uncached[key]) for key in cached)
+
+def test_cache_results_are_copies():
+    db_manager = DatabaseManager(db_file_path)
+    kwargs = db_manager.get_existing_forest_data(harvest="high", ccs=True)
+    kwargs["area"].append(0)
+    kwargs["area"][0] = -1
+
+    assert db_manager.get_existing_forest_data(harvest="high", ccs=True) == DatabaseManager(db_file_path, use_cache=False).get_existing_forest_data(harvest="high", ccs=True)
+
+def test_cache_invalidation(tmp_path):
+    db_copy = str(tmp_path / "database.db")
+    shutil.copy(db_file_path, db_copy)
+
+    cache = get_data_cache(db_copy)
+    assert get_data_cache(db_copy) is cache
+    area = DatabaseManager(db_copy).get_organic_soils("Industrial peat", "Drained")["area"]
+
+    conn = sqlite3.connect(db_copy)
+    conn.execute("""UPDATE organic_soils SET value = value * 2 WHERE metric = 'area' AND "Organic soil type" = 'Industrial peat'""")
+    conn.execute("CREATE TABLE padding (x INTEGER)")
+    conn.commit()
+    conn.close()
+
+    assert get_data_cache(db_copy) is not cache
+    assert DatabaseManager(db_copy).get_organic_soils("Industrial peat", "Drained")["area"] == 2 * area
+
+def test_precomputed_scalers():
+    config = {"baseline_year": 2020, "target_year": 2050, "cattle_systems": {"abatement": "2020 BL", "productivity": "2020 Prod", "waypoints": []}}
+
+    uncached = Optigob(json_config=config, db_file_path=db_file_path, db_manager=DatabaseManager(db_file_path, use_cache=False))
+    cached = Optigob(json_config=config, db_file_path=db_file_path)
+    dairy = cached.get_field(CATTLE_AGRICULTURE).get_system(CATTLE_AGRICULTURE_DAIRY)
+    dairy.time_series[CO2E][0] = -1
+
+    for optigob in [cached, Optigob(json_config=config, db_file_path=db_file_path)]:
+        optigob.reload()
+        for system in uncached.get_field(CATTLE_AGRICULTURE).systems:
+            assert optigob.get_field(CATTLE_AGRICULTURE).get_system(system.name).time_series == system.time_series
+
+def test_connection_pool_is_read_only():
+    pool = get_connection_pool(db_file_path)
+
+    with pool.connection() as conn:
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute("CREATE TABLE padding (x INTEGER)")
+
+    with pytest.raises(ValueError):
+        DatabaseManager(db_file_path, use_cache=False).select("sqlite_master")
+    with pytest.raises(ValueError):
+        pool.select("scalers", columns=["year\" FROM scalers; --"])
+
+def test_connection_pool_threads():
+    kwargs = {"abatement": "MACC", "productivity": "Medium increase", "agriculture": "cattle", "system": "Dairy"}
+    expected = DatabaseManager(db_file_path).get_agriculture_data(**kwargs)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(lambda _: DatabaseManager(db_file_path, use_cache=False, immutable=True).get_agriculture_data(**kwargs), range(16)))
+
+    assert all(result == expected for result in results)
+
+def test_create_database_schema(tmp_path):
+    db_new = str(tmp_path / "database.db")
+    read_forestry("data/static_systems.xlsx", db_new)
+    read_animals("data/dynamic_systems.xlsx", db_new)
+
+    conn = sqlite3.connect(db_new)
+    assert conn.execute("SELECT version FROM schema_version").fetchall() == [(SCHEMA_VERSION,)]
+    assert conn.execute("SELECT COUNT(*) FROM sqlite_stat1").fetchone()[0] > 0
+    columns = {row[1]: row[2] for row in conn.execute('PRAGMA table_info("afforestation")')}
+    assert (columns["year"], columns["o_m_ratio"], columns["area"], columns["area_unit"]) == ("INTEGER", "REAL", "REAL", "TEXT")
+    plan = conn.execute("""EXPLAIN QUERY PLAN SELECT "value" FROM non_cattle WHERE "Abatement" = ? AND "Productivity" = ? AND "System" = ?""", ("Frontier", "2020 Prod", "Sheep")).fetchall()
+    assert "USING INDEX" in plan[0][3]
+    conn.close()
+
+    kwargs = {"affor_rate": 2, "broadleaf_frac": 0.3, "organic_soil_frac": 0, "harvest": "high", "ccs": True}
+    assert DatabaseManager(db_new, use_cache=False).get_afforestation_data(**kwargs) == DatabaseManager(db_file_path).get_afforestation_data(**kwargs)
+
+def write_workbook(sheets, excel_path):
+    with pd.ExcelWriter(excel_path) as writer:
+        for name, sheet in sheets.items():
+            sheet.to_excel(writer, sheet_name=name, header=False, index=False)
+
+def test_create_database_incremental(tmp_path):
+    db_new = str(tmp_path / "database.db")
+    excel_path = str(tmp_path / "static_systems.xlsx")
+    sheets = pd.read_excel("data/static_systems.xlsx", sheet_name=None, header=None)
+    write_workbook(sheets, excel_path)
+
+    assert "willow_beccs" in read_forestry(excel_path, db_new)
+    assert read_forestry(excel_path, db_new) == []
+
+    sheets["willow_beccs"].iat[4, 1] = 1.5
+    write_workbook(sheets, excel_path)
+
+    assert read_forestry(excel_path, db_new) == ["willow_beccs"]
+    conn = sqlite3.connect(db_new)
+    assert conn.execute("SELECT willow FROM willow_beccs WHERE year = 2020").fetchall() == [(1.5,), (1.5,)]
+    conn.close()
+
+    # a failing sheet leaves the database as it was
+    sheets["existing_forest"].iat[5, 1] = 1.0
+    sheets["willow_beccs"].iat[0, 2] = "willow"
+    write_workbook(sheets, excel_path)
+    with pytest.raises(ValueError):
+        read_forestry(excel_path, db_new)
+    conn = sqlite3.connect(db_new)
+    assert set(conn.execute("SELECT area FROM existing_forest WHERE year = 2020").fetchall()) == {(781254.0,)}
+    conn.close()
+
+def test_snapshot(tmp_path):
+    # uri characters in the path are quoted
+    os.makedirs(tmp_path / "data #1?")
+    db_copy = str(tmp_path / "data #1?" / "database.db")
+    shutil.copy(db_file_path, db_copy)
+    assert load_snapshot(db_copy) is None
+
+    compile_snapshot(db_copy)
+    snapshot = load_snapshot(db_copy)
+    assert isinstance(snapshot.load_table("afforestation")["area"], np.memmap)
+
+    cache = get_data_cache(db_copy)
+    for (getter, kwargs) in GETTER_CASES:
+        result = getattr(DatabaseManager(db_copy), getter)(**kwargs)
+        assert result == getattr(DatabaseManager(db_file_path, use_cache=False), getter)(**kwargs)
+        values = result if isinstance(result, list) else [v for value in result.values() for v in (value if isinstance(value, list) else [value])]
+        assert all(type(v) in (int, float, str) for v in values)
+    assert cache.get_snapshot() is not None
+
+    # a changed database makes the snapshot outdated
+    conn = sqlite3.connect(db_copy)
+    conn.execute("CREATE TABLE padding (x INTEGER)")
+    conn.commit()
+    conn.close()
+    assert load_snapshot(db_copy) is None
+    assert get_data_cache(db_copy).get_snapshot() is None
+
+    # a cold start from the snapshot alone, without the database file
+    compile_snapshot(db_copy)
+    os.remove(db_copy)
+    clear_data_cache()
+    assert np.array_equal(DatabaseManager(db_copy).get_scalers()["Pigs"],
+                          DatabaseManager(db_file_path, use_cache=False).get_scalers()["Pigs"])
+
+def shift_stepwise(values, offset):
+    values = list(values)
+    while offset < 0:
+        del values[0]
+        values.append(values[-1])
+        offset += 1
+    while offset > 0:
+        values = [values[0]] + values
+        del values[-1]
+        offset -= 1
+    return values
+
+@pytest.mark.parametrize(
+    "implementation_year, additional_biomethane_year, willow_year",
+    [(2030, 2035, 2040), (2021, 2120, 1990), (2100, 2025, 2075), (2200, 1900, 2041)],
+)
+def test_ad_emissions_shifts(implementation_year, additional_biomethane_year, willow_year):
+    kwargs = DatabaseManager(db_file_path).get_ad_emissions(implementation_year, True, additional_biomethane_year, 1500, willow_year, 20)
+
+    for (table, prefix, offset, scaler) in [("ad_biomethane_strategy", "", implementation_year - 2030, 1.0),
+                                            ("additional_ad", "additional_", additional_biomethane_year - 2035, 1.5),
+                                            ("willow_beccs", "willow_", willow_year - 2040, 0.02)]:
+        base = DatabaseManager(db_file_path, use_cache=False).select(table, where={"ccs": "yes"})
+        for key, values in base.items():
+            if prefix + key in kwargs:
+                assert kwargs[prefix + key] == pytest.approx([v * scaler for v in shift_stepwise(values, offset)])
+
+@pytest.mark.parametrize("harvest", ["high", "low"])
+@pytest.mark.parametrize("ccs", [True, False])
+@pytest.mark.parametrize("broadleaf_frac", [0.5, 0.3])
+@pytest.mark.parametrize("organic_soil_frac", [0.15, 0])
+def test_afforestation_trajectories(harvest, ccs, broadleaf_frac, organic_soil_frac):
+    db_manager = DatabaseManager(db_file_path)
+    kwargs = db_manager.get_afforestation_data(affor_rate=1.7, broadleaf_frac=broadleaf_frac, organic_soil_frac=organic_soil_frac, harvest=harvest, ccs=ccs)
+
+    conn = sqlite3.connect(db_file_path)
+    cursor = conn.execute("""SELECT * FROM afforestation WHERE harvest_rate = ? AND ccs = ? AND bl_c_ratio = ? AND o_m_ratio = ? ORDER BY year""",
+                          (harvest, "yes" if ccs else "no", broadleaf_frac, organic_soil_frac))
+    names = [d[0] for d in cursor.description]
+    rows = cursor.fetchall()
+    conn.close()
+
+    assert len(kwargs["area"]) == len(rows) > 0
+    for key, values in kwargs.items():
+        expected = [row[names.index(key)] for row in rows]
+        if key.endswith("_unit"):
+            assert values == expected
+        else:
+            assert values == [1.7 * v for v in expected]
+
+    kwargs["area"][0] = -1
+    assert db_manager.get_afforestation_data(affor_rate=1.7, broadleaf_frac=broadleaf_frac, organic_soil_frac=organic_soil_frac, harvest=harvest, ccs=ccs)["area"][0] != -1
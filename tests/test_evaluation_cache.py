@@ -0,0 +1,49 @@
+import os
+import shutil
+import sqlite3
+
+from moo import evaluation_cache
+from moo.evaluation_cache import EvaluationCache
+
+db_file_path = "data/database.db"
+
+def test_evaluation_cache_lru(monkeypatch):
+    # without a cache file the database is not hashed
+    monkeypatch.setattr(evaluation_cache, "get_database_digest", None)
+    cache = EvaluationCache(max_size=2, db_file_path=db_file_path)
+    cache.put([1, 2], (1.0, -2.0, -3.0, -4.0))
+    cache.put([2, 3], (2.0, -2.0, -3.0, -4.0))
+
+    assert cache.get([1, 2]) == [1.0, -2.0, -3.0, -4.0]
+    cache.put([3, 4], (3.0, -2.0, -3.0, -4.0))
+
+    assert cache.get([2, 3]) is None
+    assert cache.get([3, 4]) == [3.0, -2.0, -3.0, -4.0]
+    assert (cache.hits, cache.misses) == (2, 1)
+
+def test_evaluation_cache_persistence(tmp_path, monkeypatch):
+    db_copy = str(tmp_path / "database.db")
+    shutil.copy(db_file_path, db_copy)
+    cache_file = str(tmp_path / "evaluations.db")
+
+    cache = EvaluationCache(file_path=cache_file, db_file_path=db_copy)
+    cache.put([1, 2], (1.0, -2.0, -3.0, -4.0))
+    cache.save()
+
+    assert EvaluationCache(file_path=cache_file, db_file_path=db_copy).get([1, 2]) == [1.0, -2.0, -3.0, -4.0]
+
+    # touching the database keeps the entries, objectives computed against other content or an older model are
+    # not reused
+    stat = os.stat(db_copy)
+    os.utime(db_copy, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+    assert EvaluationCache(file_path=cache_file, db_file_path=db_copy).get([1, 2]) == [1.0, -2.0, -3.0, -4.0]
+
+    monkeypatch.setattr(evaluation_cache, "CACHE_VERSION", evaluation_cache.CACHE_VERSION + 1)
+    assert EvaluationCache(file_path=cache_file, db_file_path=db_copy).get([1, 2]) is None
+    monkeypatch.undo()
+
+    conn = sqlite3.connect(db_copy)
+    conn.execute("CREATE TABLE padding (x INTEGER)")
+    conn.commit()
+    conn.close()
+    assert EvaluationCache(file_path=cache_file, db_file_path=db_copy).get([1, 2]) is None
@@ -0,0 +1,80 @@
+import copy
+import csv
+import io
+
+import openpyxl
+import pytest
+
+from optigob.optigob import Optigob
+from optigob.export import export_time_series, run_scenarios, load_npz
+from configuration.keys import *
+
+db_file_path = "data/database.db"
+
+def get_optigob(config, target_year=2050, array_backed=False):
+    config = copy.deepcopy(config)
+    config[TARGET_YEAR] = target_year
+    optigob = Optigob(json_config=config, db_file_path=db_file_path, array_backed=array_backed)
+    optigob.run()
+    return optigob
+
+@pytest.mark.parametrize("array_backed", [False, True])
+def test_export_fields(config1, array_backed):
+    optigob = get_optigob(config1, array_backed=array_backed)
+    workbook = openpyxl.load_workbook(optigob.export_time_series())
+
+    assert workbook.sheetnames == [f.name for f in optigob.fields]
+    sheet = workbook[FORESTRY]
+    rows = [[c.value for c in row] for row in sheet.iter_rows()]
+    afforestation = optigob.get_field(FORESTRY).get_system(FORESTRY_AFFORESTATION)
+    column = [i for i in range(len(rows[0])) if rows[0][i] == FORESTRY_AFFORESTATION and rows[1][i] == AREA][0]
+    assert [row[0] for row in rows[3:]] == [str(y) for y in range(2020, 2051)]
+    assert [row[column] for row in rows[3:]] == pytest.approx(list(afforestation.time_series[AREA][:31]))
+    assert list(sheet.tables.keys()) == ["Table_" + FORESTRY]
+
+@pytest.mark.parametrize("format, layout", [("csv", "long"), ("csv", "wide"), ("xlsx", "wide")])
+def test_export_long_and_wide(config1, format, layout):
+    optigob = get_optigob(config1)
+    n_series = sum(len(s.time_series) for f in optigob.fields for s in f.systems)
+
+    buffer = export_time_series(optigob, format=format, layout=layout)
+    if format == "csv":
+        rows = list(csv.reader(buffer))
+    else:
+        rows = [list(row) for row in openpyxl.load_workbook(buffer, read_only=True).active.iter_rows(values_only=True)]
+
+    assert len(rows) == 1 + (n_series * 31 if layout == "long" else n_series)
+    assert rows[0][:4] == ["scenario", "field", "system", "parameter"]
+    if layout == "wide":
+        assert [int(y) for y in rows[0][4:]] == list(range(2020, 2051))
+
+def test_export_batch(config1):
+    configs = []
+    for rate in [1.0, 3.0]:
+        config = copy.deepcopy(config1)
+        config[FORESTRY][1]["afforestation_rate"] = rate
+        configs.append(config)
+
+    buffer = io.BytesIO()
+    export_time_series(run_scenarios(configs, db_file_path, names=["low", "high"]), buffer, format="npz")
+    buffer.seek(0)
+    data = load_npz(buffer)
+
+    assert list(data.keys()) == ["low", "high"]
+    for name, config in zip(["low", "high"], configs):
+        (years, keys, values, units) = data[name]
+        optigob = Optigob(json_config=config, db_file_path=db_file_path)
+        optigob.run()
+        afforestation = optigob.get_field(FORESTRY).get_system(FORESTRY_AFFORESTATION)
+
+        assert years.tolist() == list(range(2020, 2101))
+        row = [i for i, key in enumerate(keys.tolist()) if key == [FORESTRY, FORESTRY_AFFORESTATION, AREA]][0]
+        assert values[row] == pytest.approx(afforestation.time_series[AREA][:81])
+        assert len(units) > 0
+
+    # wide batches need years covering every scenario
+    with pytest.raises(ValueError):
+        export_time_series([get_optigob(config1), get_optigob(config1, target_year=2070)], format="csv", layout="wide")
+    buffer = export_time_series([get_optigob(config1), get_optigob(config1, target_year=2070)], format="csv", layout="wide", years=range(2020, 2071))
+    rows = list(csv.reader(buffer))
+    assert rows[1][-1] == "" and rows[-1][-1] != ""
@@ -0,0 +1,41 @@
+from moo.hypervolume import hypervolume, HypervolumeHistory
+import itertools
+import numpy as np
+import pytest
+
+def grid_hypervolume(points, reference):
+    # counts the unit cells dominated by any point, points and reference on an integer grid
+    volume = 0
+    for cell in itertools.product(*[range(r) for r in reference]):
+        if any(all(p[i] <= cell[i] for i in range(len(reference))) for p in points):
+            volume += 1
+    return volume
+
+@pytest.mark.parametrize(
+    "points,reference,expected",
+    [
+        ([[1.0, 2.0], [2.0, 1.0]], [3.0, 3.0], 3.0),
+        ([[0.0, 0.0, 0.0]], [1.0, 2.0, 3.0], 6.0),
+        ([[1.0, 1.0, 1.0, 1.0], [2.0, 2.0, 2.0, 2.0], [1.0, 1.0, 1.0, 1.0]], [2.0, 2.0, 2.0, 2.0], 1.0),
+        ([[3.0, 0.0], [0.0, 3.0]], [3.0, 3.0], 0.0),
+    ],
+)
+def test_hypervolume(points, reference, expected):
+    assert hypervolume(points, reference) == pytest.approx(expected)
+
+@pytest.mark.parametrize("seed,dimensions", [(1, 3), (2, 4), (3, 4)])
+def test_hypervolume_random_fronts(seed, dimensions):
+    rng = np.random.default_rng(seed)
+    points = rng.integers(0, 5, size=(12, dimensions))
+    reference = [5] * dimensions
+
+    assert hypervolume(points, reference) == pytest.approx(grid_hypervolume(points.tolist(), reference))
+
+def test_hypervolume_history():
+    history = HypervolumeHistory(margin=0.1)
+    values = history.update({1: [[0.0, 1.0], [1.0, 0.0]]})
+    assert values[1] == pytest.approx(1.1 * 0.1 + 0.1 * 1.0)
+
+    history.values[1] = -1.0
+    values = history.update({1: [[0.0, 1.0], [1.0, 0.0]], 2: [[0.0, 0.0]]})
+    assert values == {1: -1.0, 2: pytest.approx(1.21)}
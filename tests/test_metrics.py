@@ -0,0 +1,83 @@
+import copy
+
+import numpy as np
+import pytest
+
+from optigob.optigob import Optigob
+from optigob.metrics import DEFAULT_METRIC, METRICS, apply_metric, get_weights
+from optigob.net_zero import get_emissions
+from configuration.keys import *
+
+db_file_path = "data/database.db"
+
+def get_optigob(config, co2e_metric=None):
+    config = copy.deepcopy(config)
+    if co2e_metric is not None:
+        config[CO2E_METRIC] = co2e_metric
+    optigob = Optigob(json_config=config, db_file_path=db_file_path)
+    optigob.run()
+    return optigob
+
+def get_series(evaluation, label):
+    return [values for (name, values) in evaluation if name == label][0]
+
+def test_default_metric(config1):
+    co2, n2o, ch4 = np.random.default_rng(0).random((3, 31))
+    assert apply_metric(co2, n2o, ch4).tolist() == pytest.approx((co2 + 260 * n2o + 25 * ch4).tolist())
+
+    optigob = get_optigob(config1)
+    assert optigob.co2e_metric == DEFAULT_METRIC
+    assert optigob.get_evaluation(CO2E) == get_optigob(config1, DEFAULT_METRIC).get_evaluation(CO2E)
+
+@pytest.mark.parametrize("co2e_metric, n2o, ch4", [("AR4", 298, 25), ("AR5", 265, 28), ("AR6", 273, 27)])
+def test_gwp100_metrics(config1, co2e_metric, n2o, ch4):
+    optigob = get_optigob(config1, co2e_metric)
+    evaluation = optigob.get_evaluation(CO2E)
+
+    cattle = optigob.get_field(CATTLE_AGRICULTURE).systems[0]
+    expected = [c + n2o * n + ch4 * m for c, n, m in zip(*[cattle.time_series[gas] for gas in [CO2, N2O, CH4]])]
+    assert get_series(evaluation, cattle.name) == pytest.approx(expected)
+
+    (_, emissions) = get_emissions(optigob)
+    totals = emissions.sum(axis=0)
+    assert get_series(evaluation, "net_zero_co2e") == pytest.approx((totals[0] + n2o * totals[1] + ch4 * totals[2]).tolist())
+
+def test_gwp_star_metric():
+    # pinned to Cain et al. 2019
+    gwp_star = METRICS["GWP*"]
+    assert (gwp_star.flow, gwp_star.stock, gwp_star.delay) == (4.0, 3.75, 20)
+    assert gwp_star.base.gwp.tolist() == [1.0, 260.0, 25.0]
+
+    weights = get_weights("GWP*", 30)
+    assert weights.shape == (3, 30, 30)
+
+    # constant methane emissions are worth 0.25 of their GWP100 co2e, a step up adds 4 times the step
+    ch4 = np.ones(30)
+    co2e = apply_metric(np.zeros(30), np.zeros(30), ch4, "GWP*")
+    assert co2e.tolist() == pytest.approx([25 * 0.25] * 30)
+
+    ch4[25:] = 2.0
+    co2e = apply_metric(np.zeros(30), np.zeros(30), ch4, "GWP*")
+    assert co2e[24] == pytest.approx(25 * 0.25)
+    assert co2e[25] == pytest.approx(25 * (4.0 * 2.0 - 3.75))
+
+    # co2 and n2o keep their weights
+    co2e = apply_metric(np.ones(30), np.ones(30), np.zeros(30), "GWP*")
+    assert co2e.tolist() == pytest.approx([261.0] * 30)
+
+def test_set_co2e_metric(config1):
+    optigob = get_optigob(config1)
+    default = optigob.get_evaluation(CO2E)
+    time_series = {s.name: copy.deepcopy(s.time_series) for f in optigob.fields for s in f.systems}
+
+    for co2e_metric in METRICS.keys():
+        optigob.set_co2e_metric(co2e_metric)
+        assert optigob.get_evaluation(CO2E) == get_optigob(config1, co2e_metric).get_evaluation(CO2E)
+    # re-weighting leaves the simulated series alone
+    assert {s.name: s.time_series for f in optigob.fields for s in f.systems} == time_series
+
+    optigob.set_co2e_metric(DEFAULT_METRIC)
+    assert optigob.get_evaluation(CO2E) == default
+
+    with pytest.raises(KeyError):
+        optigob.set_co2e_metric("GWP20")
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from optigob.optigob import Optigob
+from optigob.net_zero import compute_net_zero, apply_weights, GWP100
+from optigob.utils import add_two_lists, transform_to_c02e
+from configuration.keys import *
+
+db_file_path = "data/database.db"
+
+def net_zero_by_year(optigob):
+    time_span = optigob.target_year - optigob.baseline_year + 1
+    total_co2, total_n2o, total_ch4 = [], [], []
+    for f in optigob.fields:
+        (co2, n2o, ch4) = f.get_net_zero(time_span=time_span)
+        total_co2 = add_two_lists(total_co2, co2)
+        total_n2o = add_two_lists(total_n2o, n2o)
+        total_ch4 = add_two_lists(total_ch4, ch4)
+
+    co2e = [transform_to_c02e(co2=total_co2[i], n2o=total_n2o[i], ch4=total_ch4[i]) for i in range(time_span)]
+    split_gas = [transform_to_c02e(co2=total_co2[i], n2o=total_n2o[i], ch4=0) for i in range(time_span)]
+    return co2e, split_gas, list(total_ch4)
+
+@pytest.mark.parametrize("array_backed", [False, True])
+def test_net_zero_matches_year_by_year(config1, array_backed):
+    optigob = Optigob(json_config=config1, db_file_path=db_file_path, array_backed=array_backed)
+    optigob.run()
+
+    result = compute_net_zero(optigob)
+    (co2e, split_gas, ch4) = net_zero_by_year(optigob)
+    assert result.co2e.tolist() == pytest.approx(co2e)
+    assert result.split_gas.tolist() == pytest.approx(split_gas)
+    assert result.ch4.tolist() == pytest.approx(ch4)
+
+    assert result.emissions.shape == (len(result.systems), 3, 81)
+    assert np.sum([c for (_, c) in result.get_contributions()], axis=0) == pytest.approx(result.co2e)
+    assert dict(optigob.get_evaluation(CO2E))["net_zero_co2e"] == pytest.approx(co2e)
+
+    # the same plain lists as before the array accounting
+    calculations = optigob.get_net_zero_calculations()
+    assert all(type(values) is list for values in calculations)
+    assert calculations[2] == pytest.approx(ch4)
+
+def test_net_zero_weight_matrices(config1):
+    optigob = Optigob(json_config=config1, db_file_path=db_file_path)
+    optigob.run()
+    result = compute_net_zero(optigob)
+
+    # per-gas year by year operators that only weight the same year reduce to the weight vector
+    operators = np.stack([w * np.eye(len(result.years)) for w in GWP100])
+    assert apply_weights(result.emissions, operators) == pytest.approx(result.co2e_by_system)
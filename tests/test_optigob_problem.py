@@ -0,0 +1,44 @@
+from optigob.optigob import Optigob
+from moo.optigob_problem import CompiledOptigob, build_json_config, heal_variables, get_objective, DEFAULT_LOWER_BOUND, DEFAULT_UPPER_BOUND
+from configuration.keys import *
+import random
+import pytest
+
+db_file_path = "data/database.db"
+
+def get_objectives(optigob):
+    return [get_objective(optigob=optigob, parameter=CO2E, filter="net_zero_co2e"),
+            get_objective(optigob=optigob, parameter=BIODIVERSITY),
+            get_objective(optigob=optigob, parameter=PROTEIN),
+            get_objective(optigob=optigob, parameter=HWP)]
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_compiled_optigob_matches_json_config(seed):
+    rng = random.Random(seed)
+    compiled = CompiledOptigob(db_file_path=db_file_path)
+
+    for ad_implementation in [0, 1]:
+        variables = [rng.randint(lb, ub) for (lb, ub) in zip(DEFAULT_LOWER_BOUND, DEFAULT_UPPER_BOUND)]
+        variables[76] = ad_implementation
+        heal_variables(variables, DEFAULT_UPPER_BOUND)
+
+        optigob = Optigob(json_config=build_json_config(variables), db_file_path=db_file_path)
+        optigob.run()
+
+        assert get_objectives(compiled.evaluate(variables)) == pytest.approx(get_objectives(optigob))
+        assert (compiled.optigob.get_field(AD_EMISSIONS) is None) == (optigob.get_field(AD_EMISSIONS) is None)
+
+def test_evaluation_is_cached_per_run():
+    variables = heal_variables(list(DEFAULT_UPPER_BOUND), DEFAULT_UPPER_BOUND)
+    optigob = Optigob(json_config=build_json_config(variables), db_file_path=db_file_path)
+    optigob.run()
+
+    evaluation = optigob.get_evaluation(PROTEIN)
+    expected = sum(sum(value) for (label, value) in evaluation if "total_" in label)
+    evaluation[0][1][0] = 1e12
+
+    assert optigob.get_evaluation(PROTEIN)[0][1][0] != 1e12
+    assert get_objective(optigob=optigob, parameter=PROTEIN) == pytest.approx(expected)
+
+    optigob.run()
+    assert PROTEIN not in optigob.evaluations
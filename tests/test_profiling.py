@@ -0,0 +1,54 @@
+from optigob.optigob import Optigob
+from optigob import profiling
+from resource_manager.database_manager import DatabaseManager
+from configuration.keys import *
+import json
+
+db_file_path = "data/database.db"
+
+def test_profiling(tmp_path, config1):
+    with profiling.profile() as profiler:
+        optigob = Optigob(json_config=config1, db_file_path=db_file_path)
+        optigob.run()
+        optigob.get_evaluation(CO2E)
+
+    summary = profiler.get_summary()
+    stages = set(summary["stage"])
+    for stage in ["load_data", "apply_scalers", "run", "interpolation", "run_cattle_systems", "area_balancing", "get_evaluation co2e", "db_lookup"]:
+        assert stage in stages
+
+    counters = profiler.get_counters()
+    assert counters[(counters["counter"] == "db_lookups") & (counters["field"] == "non_cattle")]["value"].sum() >= 1
+
+    trace_file = tmp_path / "trace.json"
+    profiler.save_chrome_trace(str(trace_file))
+    with open(trace_file) as f:
+        assert len(json.load(f)["traceEvents"]) == summary["calls"].sum()
+
+    assert profiling.get_profiler() is None
+    assert profiling.timer("run") is profiling.timer("load_data")
+
+def get_counter(profiler, name, field):
+    counters = profiler.get_counters()
+    return counters[(counters["counter"] == name) & (counters["field"] == field)]["value"].sum()
+
+def test_profiling_db_queries(config1):
+    # only sql that runs is counted as a query, lookups served from the process-wide cache are not
+    with profiling.profile() as profiler:
+        Optigob(json_config=config1, db_file_path=db_file_path).run()
+    assert get_counter(profiler, "db_lookups", "non_cattle") > get_counter(profiler, "db_queries", "non_cattle")
+
+    with profiling.profile() as profiler:
+        db_manager = DatabaseManager(db_file_path, use_cache=False)
+        Optigob(json_config=config1, db_file_path=db_file_path, db_manager=db_manager).run()
+    assert get_counter(profiler, "db_queries", "non_cattle") == get_counter(profiler, "db_lookups", "non_cattle") > 0
+
+def test_profiling_is_scoped():
+    # the state before the with block is restored
+    try:
+        outer = profiling.enable_profiling()
+        with profiling.profile() as inner:
+            assert profiling.get_profiler() is inner
+        assert profiling.get_profiler() is outer
+    finally:
+        profiling.disable_profiling()
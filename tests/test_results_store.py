@@ -0,0 +1,27 @@
+from moo.results_store import ResultsStore, open_results, get_generations, load_objectives, load_generation, get_config
+from moo.optigob_problem import build_json_config, heal_variables, DEFAULT_UPPER_BOUND
+
+db_file_path = "data/database.db"
+
+def test_results_store(tmp_path):
+    file_path = str(tmp_path / "pareto.db")
+    variables = heal_variables(list(DEFAULT_UPPER_BOUND), DEFAULT_UPPER_BOUND)
+
+    store = ResultsStore(file_path, buffer_size=3)
+    store.append(1, [(variables, (1.0, -2.0, -3.0, -4.0)), (variables, (2.0, -1.0, -3.0, -4.0))])
+    store.append(2, [(variables, (0.5, -2.0, -3.0, -4.0))])
+
+    # the buffer is written once it is full
+    conn = open_results(file_path)
+    assert get_generations(conn) == [1, 2]
+
+    store.append(3, [(variables, (0.1, -2.0, -3.0, -4.0))])
+    store.close()
+
+    generations = load_objectives(conn, after_generation=2)
+    assert list(generations.keys()) == [3]
+    assert generations[3]["co2e"].tolist() == [0.1]
+
+    df = load_generation(conn, 1)
+    assert df["hnv"].tolist() == [-2.0, -1.0]
+    assert get_config(df["variables"][0]) == build_json_config(variables)
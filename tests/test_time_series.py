@@ -0,0 +1,95 @@
+from optigob.optigob import Optigob
+from optigob.time_series import TimeSeries
+from optigob.systems.non_cattle_agriculture import NonCattleSystem
+import numpy as np
+from configuration.keys import *
+from tests.configs import config1
+import copy
+import pytest
+
+db_file_path = "data/database.db"
+
+def test_time_series_interpolation():
+    ts = TimeSeries.from_dict({AREA: [10.0], "area_unit": ["ha"]}, baseline_year=2020, target_year=2040)
+    ts_list = {AREA: [10.0], "area_unit": ["ha"]}
+
+    for (year, area) in [(2025, 20.0), (2030, 10.0), (2028, 0.0)]:
+        ts.interpolate({AREA: area, "area_unit": "ha"}, year)
+
+    assert ts.get_current_year() == 2030
+    assert ts[AREA].tolist() == [10.0, 12.0, 14.0, 16.0, 18.0, 20.0, 18.0, 16.0, 0.0, 12.0, 10.0]
+    assert ts["area_unit"] == ["ha"] * 11
+
+    # a waypoint beyond the horizon keeps its slope
+    ts.interpolate({AREA: 40.0}, 2050)
+    assert ts.get_current_year() == 2040
+    assert ts[AREA][-1] == 25.0
+
+@pytest.mark.parametrize(
+    "config",
+    [
+        config1,
+        {"baseline_year": 2020, "target_year": 2050, "ad_emissions": {"implementation_year": 2025, "ccs": True, "additional_biomethane_year": 2040, "additional_grass_biomethane": 1000.0, "willow_year": 2045, "cdr_bioenergy": 300.0}},
+    ],
+)
+def test_array_backed_matches_lists(config):
+    optigob = Optigob(json_config=copy.deepcopy(config), db_file_path=db_file_path)
+    optigob.run()
+    optigob_array = Optigob(json_config=copy.deepcopy(config), db_file_path=db_file_path, array_backed=True)
+    optigob_array.run()
+
+    timespan = optigob.target_year - optigob.baseline_year + 1
+    for f, f_array in zip(optigob.fields, optigob_array.fields):
+        for s, s_array in zip(f.systems, f_array.systems):
+            assert isinstance(s_array.time_series, TimeSeries)
+            assert list(s.time_series.keys()) == list(s_array.time_series.keys())
+            for key, value in s.time_series.items():
+                assert len(s_array.time_series[key]) == timespan
+                for i in range(timespan):
+                    if isinstance(value[i], str):
+                        assert value[i] == s_array.time_series[key][i]
+                    else:
+                        assert value[i] == pytest.approx(s_array.time_series[key][i])
+
+    for parameter in [CO2E, AREA, PROTEIN, BIODIVERSITY]:
+        evaluation = optigob.get_evaluation(parameter)
+        evaluation_array = optigob_array.get_evaluation(parameter)
+        assert [label for (label, _) in evaluation] == [label for (label, _) in evaluation_array]
+        for (_, value), (_, value_array) in zip(evaluation, evaluation_array):
+            assert isinstance(value_array, list)
+            assert value[:timespan] == pytest.approx(value_array[:timespan])
+
+def stepwise_schedule(system, schedule, baseline_year, target_year):
+    # per waypoint interpolation followed by holding the last values, as before run_schedule
+    for (year, config) in schedule:
+        system.update_time_series(new_config=config, baseline_year=baseline_year, target_year=year)
+    if system.get_current_year(baseline_year) < target_year:
+        system.update_time_series(new_config=system.get_parameters_by_index(-1), baseline_year=baseline_year, target_year=target_year)
+
+@pytest.mark.parametrize(
+    "time_series,schedule,target_year",
+    [
+        # plain interpolation with units, target beyond the last waypoint
+        ({AREA: [10.0], "area_unit": ["ha"], CO2: [3.0]},
+         [(2025, {AREA: 20.0, "area_unit": "ha", CO2: 1.0}), (2030, {AREA: 5.0, "area_unit": "kha", CO2: 2.0})], 2040),
+        # waypoints at or before the last filled year overwrite entries
+        ({AREA: [10.0, 11.0, 12.0, 13.0, 14.0, 15.0], "area_unit": ["ha"] * 6},
+         [(2022, {AREA: 0.0, "area_unit": "kha"}), (2030, {AREA: 30.0, "area_unit": "ha"}), (2020, {AREA: 1.0, "area_unit": "ha"})], 2035),
+        # numpy scalars as left by the scalers, integers and a waypoint beyond the target year
+        ({AREA: [np.float64(1.5)] * 6, CO2: [2]},
+         [(2030, {AREA: np.float64(3.0), CO2: 4}), (2060, {AREA: 1.0, CO2: 7.5})], 2050),
+        # keys missing from a waypoint config, no waypoints at all
+        ({AREA: [1.0], CO2: [2.0]}, [(2024, {AREA: 5.0}), (2028, {AREA: 6.0, CO2: 1.0})], 2030),
+        ({AREA: [1.0], CO2: [2.0]}, [], 2030),
+    ],
+)
+def test_schedule_matches_stepwise_interpolation(time_series, schedule, target_year):
+    system = NonCattleSystem(name="Pigs", time_series=copy.deepcopy(time_series), waypoints=[], baseline_abatement="", baseline_productivity="")
+    expected = NonCattleSystem(name="Pigs", time_series=copy.deepcopy(time_series), waypoints=[], baseline_abatement="", baseline_productivity="")
+
+    system.run_schedule(copy.deepcopy(schedule), 2020, target_year)
+    stepwise_schedule(expected, copy.deepcopy(schedule), 2020, target_year)
+
+    assert system.time_series == expected.time_series
+    for key, value in expected.time_series.items():
+        assert [type(v) for v in system.time_series[key]] == [type(v) for v in value]